@@ -1,14 +1,45 @@
 from pathlib import Path
 from os.path import dirname, abspath
+from tempfile import gettempdir
 
 # path variables
 PROJECT_PATH = Path(abspath(dirname(__name__)))
 LOG_PATH = PROJECT_PATH / 'log'
 
-# buffer size for TCP connections
+# initial size of the buffer each connection between agents reads its frames into, which grows to the largest frame
 BUFFER_SIZE = 2048
+# minimum payload size in bytes of frames sent zlib compressed between agents, or None to never compress
+FRAME_COMPRESSION_THRESHOLD = None
 
 # aTLAS Version for check at supervisor <-> director connection
 ATLAS_VERSION = "v 0.0.1"
 
 TIME_MEASURE = True
+
+# durability policy of the FileLogger's buffered writing, where None writes each line by opening and closing the file,
+# 'flush' keeps files open and flushes each write, 'threshold' flushes all buffered lines once LOG_BUFFER_MAX_LINES
+# are buffered or the oldest is LOG_BUFFER_MAX_SECONDS old, and 'end' flushes only before reads and at scenario end
+LOG_BUFFER_POLICY = None
+LOG_BUFFER_MAX_LINES = 1000
+LOG_BUFFER_MAX_SECONDS = 1.0
+# maximum number of log files the FileLogger keeps open at once while buffering
+LOG_MAX_OPEN_FILES = 256
+# maximum number of answers to trust protocol operations each agent caches
+RESPONSE_CACHE_MAX_ENTRIES = 4096
+
+# concurrent requests of one agent to its peers, where each request times out after PEER_REQUEST_TIMEOUT seconds and
+# all requests together after PEER_DEADLINE seconds, while peers not responding in time count as not answering
+PEER_FANOUT_WORKERS = 32
+PEER_REQUEST_TIMEOUT = 5.0
+PEER_DEADLINE = 10.0
+# threads shared by all agents of a scenario run to calculate the trust metrics asking other agents concurrently
+METRIC_WORKERS = 32
+# 'threads' serves each local agent by its own server thread with one thread per connection, while 'asyncio' serves
+# all local agents of a scenario run on one event loop, where either server evaluates observations with
+# AGENT_EVAL_WORKERS threads and answers trust protocol requests with AGENT_REQUEST_WORKERS threads
+AGENT_SERVER_MODE = 'threads'
+AGENT_EVAL_WORKERS = 32
+AGENT_REQUEST_WORKERS = 32
+# directory of the Unix domain sockets all agents are additionally served at, which agents at supervisors of the same
+# host connect to instead of TCP on the loopback path, or None to serve agents by TCP only
+UNIX_SOCKET_DIR = Path(gettempdir()) / 'aTLAS_sockets'
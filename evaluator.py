@@ -91,7 +91,8 @@ if __name__ == '__main__':
                         help="The connector class to use for connecting to director.")
     parser.add_argument("-d", "--director", default="127.0.0.1:8000",
                         help="The hostname of the director, where the evaluation script shall register at.")
-    parser.add_argument("-log", "--logger", default="FileLogger", choices=['FileLogger'],
+    parser.add_argument("-log", "--logger", default="FileLogger",
+                        choices=['FileLogger', 'MemoryLogger', 'SqliteLogger'],
                         help="The logger class to use for logging trust values during a scenario run.")
     parser.add_argument("-wss", "--sec-socket", type=lambda x: bool(strtobool(x)), nargs='?', const=True,
                         default=False, help="Whether to use a secure websocket connection to the director.")
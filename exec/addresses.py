@@ -0,0 +1,66 @@
+import os
+import socket
+from config import UNIX_SOCKET_DIR
+
+# maximum length of a Unix domain socket path, as sun_path holds 108 bytes on Linux including the terminating null
+UNIX_PATH_MAX = 107
+
+
+def unix_socket_path(ip_address, port):
+    """
+    :param ip_address: IP address the agent is served at by TCP.
+    :type ip_address: str
+    :param port: TCP port the agent is served at.
+    :type port: int
+    :return: Path of the Unix domain socket the agent is additionally served at, or None if Unix domain sockets are
+    disabled by UNIX_SOCKET_DIR or not supported.
+    :rtype: str or None
+    """
+    if UNIX_SOCKET_DIR is None or not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = str(UNIX_SOCKET_DIR / f"{ip_address}_{port}.sock")
+    if len(path.encode('utf-8')) > UNIX_PATH_MAX:
+        return None
+    UNIX_SOCKET_DIR.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def remove_socket_file(path):
+    """
+    Removes the file of a Unix domain socket, e.g. left by a former scenario run before binding to it again.
+
+    :type path: str
+    :rtype: None
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def format_address(ip_address, port, unix_path=None):
+    """
+    :param ip_address: IP address the agent is served at.
+    :type ip_address: str
+    :param port: TCP port the agent is served at.
+    :type port: int
+    :param unix_path: Path of the Unix domain socket the agent is additionally served at, if any.
+    :type unix_path: str
+    :return: The agent's address for the discovery as 'ip:port', or 'ip:port:unix_path' if served by a Unix domain
+    socket.
+    :rtype: str
+    """
+    if unix_path is None:
+        return f"{ip_address}:{port}"
+    return f"{ip_address}:{port}:{unix_path}"
+
+
+def parse_address(address):
+    """
+    :param address: The agent's address in the discovery.
+    :type address: str
+    :return: The agent's IP address, TCP port and path of the Unix domain socket or None if not served by one.
+    :rtype: tuple
+    """
+    ip_address, port, *unix_path = address.split(":", 2)
+    return ip_address, int(port), unix_path[0] if unix_path else None
@@ -1,28 +1,23 @@
-import socket
 from threading import Thread
-from config import BUFFER_SIZE
+from .connection_pool import connection_pool, RequestNotSentError
 
 
 class AgentClient(Thread):
     def run(self):
-        tcp_client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_client.connect((self.remote_ip, self.remote_port))
-        # send message
-        tcp_client.send(bytes(self.message, 'UTF-8'))
-        receive_data = tcp_client.recv(BUFFER_SIZE)
-        # print("data sent at :"  + time.ctime(time.time()))
-        receive_data = receive_data.decode('utf-8')
+        # send message over the pooled connection to the receiving agent and wait for its response
+        try:
+            receive_data = connection_pool.request(self.remote_ip, self.remote_port, self.message,
+                                                   unix_path=self.unix_path)
+        except RequestNotSentError:
+            # the pooled connection was closed before sending, thus the message is sent once more on a new connection,
+            # while failures after sending are raised as other agent may have evaluated the observation already
+            receive_data = connection_pool.request(self.remote_ip, self.remote_port, self.message,
+                                                   unix_path=self.unix_path)
         # print(receive_data)
-        tcp_client.shutdown(socket.SHUT_RDWR)
-        # tcp_client.close()
-        socket.close(tcp_client.fileno())
 
-    def __init__(self, remote_ip, remote_port, message):
+    def __init__(self, remote_ip, remote_port, message, unix_path=None):
         Thread.__init__(self)
         self.remote_ip = remote_ip
         self.remote_port = remote_port
         self.message = message
-
-
-
-
+        self.unix_path = unix_path
@@ -0,0 +1,155 @@
+import json
+import time
+from copy import copy
+from datetime import datetime
+from trust.trust_evaluation import eval_trust
+from trust.init_trust import eval_trust_with_init
+from trust.metric_registry import MetricPlan
+from models import Observation, init_scale_object
+from trust.artifacts.content_trust.recommendation import recommendation_response
+from trust.artifacts.content_trust.popularity import popularity_response
+from trust.trust_protocol import batch_response
+from loggers.basic_logger import BasicLogger
+from config import TIME_MEASURE
+from .response_cache import ResponseCache
+
+
+class AgentHandler:
+    """
+    Handles the messages received by one local agent independent of how they are received, thus answers the trust
+    protocol operations of other agents and evaluates the trust of observations. It is shared by all connections of
+    the agent, while the agent's scale is copied for each observation as evaluations change its cooperation threshold.
+    """
+    def set_discovery(self, discovery):
+        self.discovery = discovery
+        self.plan = MetricPlan(self.agent_behavior, discovery)
+
+    def trust_protocol_response(self, decoded_msg, remote):
+        """
+        :param decoded_msg: The received trust protocol message starting with 'aTLAS_trust_protocol::'.
+        :type decoded_msg: str
+        :param remote: Address of the requesting agent as 'ip:port' for printing.
+        :type remote: str
+        :return: The response to send to the requesting agent.
+        :rtype: str
+        """
+        trust_protocol_head, trust_protocol_message = decoded_msg.split("::", 1)
+        trust_operation = trust_protocol_message.split("_")[0]
+        print(f"Received trust operation <{trust_operation}> from {remote}")
+        trust_value = 0.0
+        if trust_operation == "recommendation":
+            resource_id = trust_protocol_message.split("_")[1]
+            recency_str = trust_protocol_message.split("_")[-1]
+            recency_limit = datetime.strptime(recency_str, BasicLogger.get_time_format_string())
+            trust_value = self.response_cache.response(
+                trust_operation, resource_id, recency_limit,
+                lambda: recommendation_response(self.agent, resource_id, recency_limit, self.scale, self.logger))
+        elif trust_operation == "popularity":
+            resource_id = trust_protocol_message.split("_")[1]
+            recency_str = trust_protocol_message.split("_")[-1]
+            recency_limit = datetime.strptime(recency_str, BasicLogger.get_time_format_string())
+            trust_value = self.response_cache.response(
+                trust_operation, resource_id, recency_limit,
+                lambda: popularity_response(self.agent, resource_id, recency_limit, self.scale, self.logger))
+        elif trust_operation == "batch":
+            trust_value = batch_response(self.agent, trust_protocol_message, self.scale, self.logger,
+                                         self.response_cache)
+            # the batch requests are not repeated in the response to keep it small
+            trust_protocol_message = trust_operation
+        return f"{trust_protocol_head}::{trust_protocol_message}::{trust_value}"
+
+    def observation_response(self, decoded_msg, remote):
+        """
+        :param decoded_msg: The received observation as JSON.
+        :type decoded_msg: str
+        :param remote: Address of the sending agent as 'ip:port' for printing.
+        :type remote: str
+        :return: The response to send to the sending agent.
+        :rtype: str
+        """
+        return self.evaluate_observation(Observation(**json.loads(decoded_msg)), remote)
+
+    def evaluate_observation(self, observation, remote):
+        """
+        Evaluates the trust of the received observation and logs it.
+
+        :param observation: The received observation.
+        :type observation: Observation
+        :param remote: Address of the sending agent as 'ip:port', or 'local' if delivered in process, for printing.
+        :type remote: str
+        :return: The response to send to the sending agent.
+        :rtype: str
+        """
+        print(f"Received observation {observation.observation_id} from {remote}")
+        resource_id = None
+        if 'uri' in observation.details:
+            resource_id = observation.details['uri']
+        self.logger.write_to_agent_message_log(observation)
+        scale = copy(self.scale)
+        trust_eval_time = None
+        if TIME_MEASURE:
+            trust_eval_start = time.time()
+        if '__init__' in self.agent_behavior:
+            trust_value = eval_trust_with_init(self.agent, observation.sender, observation, self.agent_behavior, scale,
+                                               self.logger, self.discovery)
+        else:
+            trust_value = eval_trust(self.agent, observation.sender, observation, self.agent_behavior, scale,
+                                     self.logger, self.discovery, self.plan)
+        if TIME_MEASURE:
+            trust_eval_end = time.time()
+            # noinspection PyUnboundLocalVariable
+            trust_eval_time = trust_eval_end - trust_eval_start
+            # print(f"Trust Evaluation took {trust_eval_time} s")
+        self.logger.write_to_agent_history(self.agent, observation.sender, trust_value, resource_id)
+        self.logger.write_to_trust_log(self.agent, observation.sender, trust_value, resource_id, trust_eval_time)
+        # topic trust log is written within the trust evaluation
+        # self.logger.write_to_agent_topic_trust(self.agent, observation.sender, observation.topic,
+        #                                        trust_value, resource_id)
+        # TODO: how to work with trust decisions in general?
+        # if float(trust_value) < self.scenario.trust_thresholds['lower_limit']:
+        #     untrustedAgents.append(other_agent)
+        #     print("+++" + current_agent + ", nodes beyond redemption: " + other_agent + "+++")
+        # if float(trust_value) > self.scenario.trust_thresholds['upper_limit'] or float(trust_value) > 1:
+        #     self.scenario.authority.append(current_agent[2:3])
+        # print("Node " + str(self.id) + " Server received data:", observation[2:-1])
+        self.observations_done.append(observation.serialize())
+        return 'standard response'
+
+    def response(self, decoded_msg, remote):
+        """
+        :param decoded_msg: The received trust protocol message or observation.
+        :type decoded_msg: str
+        :param remote: Address of the sending agent as 'ip:port' for printing.
+        :type remote: str
+        :return: The response to send to the sending agent.
+        :rtype: str
+        """
+        if decoded_msg.startswith("aTLAS_trust_protocol::"):
+            return self.trust_protocol_response(decoded_msg, remote)
+        return self.observation_response(decoded_msg, remote)
+
+    def print_cache_statistics(self):
+        print(f"Agent '{self.agent}' answered trust operations with {self.response_cache.hits} cache hits and "
+              f"{self.response_cache.misses} cache misses")
+
+    def __init__(self, agent, agent_behavior, scale, logger, observations_done):
+        """
+        :param agent: The local agent.
+        :type agent: str
+        :param agent_behavior: Metrics to be used the agent.
+        :type agent_behavior: dict
+        :param scale: The scale definition of the agent.
+        :type scale: dict
+        :param logger: The logger object to be used by the agent.
+        :type logger: BasicLogger
+        :param observations_done: Shared list of the observations executed, to which each evaluated one is appended.
+        :type observations_done: list
+        """
+        self.agent = agent
+        self.agent_behavior = agent_behavior
+        self.scale = init_scale_object(scale)
+        self.logger = logger
+        self.observations_done = observations_done
+        self.response_cache = ResponseCache(agent, logger)
+        self.discovery = {}
+        self.plan = MetricPlan(agent_behavior, self.discovery)
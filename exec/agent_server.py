@@ -1,56 +1,94 @@
+import select
 import socket
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread, Event
 
 from .agent_server_thread import ServerThread
+from .agent_handler import AgentHandler
+from .local_transport import local_transport
+from .addresses import remove_socket_file
 
 
 class AgentServer(Thread):
     def run(self):
         self.tcp_server.bind((self.ip_address, self.port))
-        print(f"Agent '{self.agent}' listens on {self.ip_address}:{self.port}")
+        self.tcp_server.listen(4)
+        server_sockets = [self.tcp_server]
+        if self.unix_server is not None:
+            remove_socket_file(self.unix_path)
+            self.unix_server.bind(self.unix_path)
+            self.unix_server.listen(4)
+            server_sockets.append(self.unix_server)
+            print(f"Agent '{self.agent}' listens on {self.ip_address}:{self.port} and {self.unix_path}")
+        else:
+            print(f"Agent '{self.agent}' listens on {self.ip_address}:{self.port}")
         while not self._stop_event.is_set():
-            self.tcp_server.listen(4)
-            (conn, (ip, port)) = self.tcp_server.accept()
-            # print(f"Connection established with: {ip}:{port}")
-            new_thread = ServerThread(conn, ip, port, self.agent, self.agent_behavior, self.scale, self.logger,
-                                      self.observations_done, self.discovery)
-            new_thread.start()
-            self.threads.append(new_thread)
+            readable, _, _ = select.select(server_sockets, [], [])
+            for server_socket in readable:
+                if server_socket is self.tcp_server:
+                    (conn, (ip, port)) = self.tcp_server.accept()
+                else:
+                    # agents at the same host are not distinguished by their address
+                    conn, _ = self.unix_server.accept()
+                    ip, port = 'unix socket', None
+                # print(f"Connection established with: {ip}:{port}")
+                new_thread = ServerThread(conn, ip, port, self.handler, self.eval_executor, self.request_executor)
+                new_thread.start()
+                # finished threads are released instead of kept until the end of the scenario run
+                self.threads = [thread for thread in self.threads if thread.is_alive()]
+                self.threads.append(new_thread)
+        if self.unix_server is not None:
+            self.unix_server.close()
+            remove_socket_file(self.unix_path)
         for thread in self.threads:
+            # long-lived connections of other agents' connection pools are ended by the server
+            thread.end_connection()
             if thread.is_alive():
                 thread.join()
+        self.handler.print_cache_statistics()
 
     def end_server(self):
+        local_transport.unregister(self.ip_address, self.port)
         self._stop_event.set()
         close_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         close_sock.connect((self.ip_address, self.port))
         close_sock.send(bytes("END", 'UTF-8'))
         close_sock.shutdown(socket.SHUT_RDWR)
-        # close_sock.close()
-        socket.close(close_sock.fileno())
+        close_sock.close()
 
     def set_discovery(self, discovery):
-        self.discovery = discovery
+        self.handler.set_discovery(discovery)
 
     def __init__(self, agent, ip_address, port, agent_behavior, scale, logger,
-                 observations_done):
+                 observations_done, eval_executor, request_executor, unix_path=None):
+        """
+        :param eval_executor: Thread pool evaluating observations, shared by all servers of the scenario run.
+        :type eval_executor: ThreadPoolExecutor
+        :param request_executor: Thread pool answering trust protocol requests, shared by all servers of the
+        scenario run.
+        :type request_executor: ThreadPoolExecutor
+        :param unix_path: Path of the Unix domain socket the agent is additionally served at, if any.
+        :type unix_path: str
+        """
         Thread.__init__(self)
         self.agent = agent
         self.ip_address = ip_address
         self.port = port
+        self.unix_path = unix_path
         self.threads = []
-        self.logger = logger
-        self.agent_behavior = agent_behavior
-        self.scale = scale
-        self.observations_done = observations_done
+        self.handler = AgentHandler(agent, agent_behavior, scale, logger, observations_done)
+        local_transport.register(ip_address, port, self.handler)
         self._stop_event = Event()
-        self.discovery = {}
+        # requests pipelined on the connections are answered by the bounded thread pools of the scenario run, where
+        # trust protocol requests are answered even while all observations evaluated wait for other agents
+        self.eval_executor = eval_executor
+        self.request_executor = request_executor
         self.tcp_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.tcp_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.unix_server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) if unix_path is not None else None
 
     def __del__(self):
         # print("Closing server socket:", self.sock)
         self.tcp_server.shutdown(socket.SHUT_RDWR)
-        # self.tcp_server.close()
-        socket.close(self.tcp_server.fileno())
+        self.tcp_server.close()
 
@@ -1,10 +1,22 @@
-import socket
-from config import BUFFER_SIZE
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from config import PEER_FANOUT_WORKERS, PEER_REQUEST_TIMEOUT, PEER_DEADLINE
+from .connection_pool import connection_pool
+from .addresses import parse_address
+from .local_transport import local_transport
 
+# thread pool shared by all agents of the scenario run's process to ask their peers
+peer_executor = None
+peer_executor_lock = Lock()
+# seconds between checks whether a fan-out was cancelled while waiting for responses
+cancel_poll_interval = 0.05
 
-def ask_other_agent(remote_ip, remote_port, message):
+
+def ask_other_agent(remote_ip, remote_port, message, timeout=None, unix_path=None):
     """
-    Connects via TCP socket to other agent, sends message and return response.
+    Sends message to other agent over the pooled connection to it and return response, or hands it directly to
+    other agent's handler if served within this process.
 
     :param remote_ip: IP address of other agent.
     :type remote_ip: str
@@ -12,19 +24,70 @@ def ask_other_agent(remote_ip, remote_port, message):
     :type remote_port: int
     :param message: Message to send to other agent.
     :type message: str
+    :param timeout: Seconds to wait at most for connecting and the response, or None to block.
+    :type timeout: float
+    :param unix_path: Path of the Unix domain socket of other agent, used if other agent is at the same host.
+    :type unix_path: str
     :return: Response of other agent.
     :rtype: str
+    :raises socket.timeout: The other agent did not respond within `timeout`.
     """
 
     request_message = f"aTLAS_trust_protocol::{message}"
-    tcp_client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    tcp_client.connect((remote_ip, remote_port))
-    # send message
-    tcp_client.send(bytes(request_message, 'UTF-8'))
-    receive_data = tcp_client.recv(BUFFER_SIZE)
-    receive_data = receive_data.decode('utf-8')
-    tcp_client.shutdown(socket.SHUT_RDWR)
-    # tcp_client.close()
-    socket.close(tcp_client.fileno())
+    local_handler = local_transport.handler(remote_ip, remote_port)
+    if local_handler is not None:
+        return local_handler.trust_protocol_response(request_message, 'local').split("::")[2]
+    receive_data = connection_pool.request(remote_ip, remote_port, request_message, timeout, unix_path)
     return receive_data.split("::")[2]
 
+
+def ask_other_agents(peers, discovery, message, timeout=PEER_REQUEST_TIMEOUT, deadline=PEER_DEADLINE,
+                     cancel_event=None):
+    """
+    Sends message to all peers concurrently and returns their responses, such that asking all peers takes about as
+    long as the slowest peer. Peers not responding within `timeout` or before `deadline` for all requests is reached,
+    as well as peers that are unreachable, are handled as not answering with a response of None. Once `cancel_event`
+    is set, the fan-out stops waiting and handles all outstanding peers the same way.
+
+    :param peers: The agents to ask.
+    :type peers: list
+    :param discovery: Addresses of all agents within the scenario.
+    :type discovery: dict
+    :param message: Message to send to all peers.
+    :type message: str
+    :param timeout: Seconds to wait at most for each peer's connection and response.
+    :type timeout: float
+    :param deadline: Seconds to wait at most for all responses.
+    :type deadline: float
+    :param cancel_event: Event set when the responses are not needed anymore.
+    :type cancel_event: threading.Event
+    :return: Response of each peer or None if it did not answer, in order of `peers`.
+    :rtype: dict
+    """
+    global peer_executor
+    with peer_executor_lock:
+        if peer_executor is None:
+            peer_executor = ThreadPoolExecutor(max_workers=PEER_FANOUT_WORKERS, thread_name_prefix="peer_request")
+    futures = {}
+    for peer in peers:
+        remote_ip, remote_port, unix_path = parse_address(discovery[peer])
+        futures[peer] = peer_executor.submit(ask_other_agent, remote_ip, remote_port, message, timeout, unix_path)
+    deadline_time = time.monotonic() + deadline
+    pending = set(futures.values())
+    while pending and not (cancel_event is not None and cancel_event.is_set()):
+        remaining = deadline_time - time.monotonic()
+        if remaining <= 0:
+            break
+        _, pending = wait(pending, timeout=remaining if cancel_event is None else min(remaining, cancel_poll_interval))
+    responses = {}
+    for peer, future in futures.items():
+        # requests not started before the deadline or cancellation are dropped, while started ones end by their own
+        # timeout
+        if not future.done():
+            future.cancel()
+            responses[peer] = None
+        elif future.cancelled() or future.exception() is not None:
+            responses[peer] = None
+        else:
+            responses[peer] = future.result()
+    return responses
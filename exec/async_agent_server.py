@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Thread
+from config import AGENT_EVAL_WORKERS, AGENT_REQUEST_WORKERS
+from .agent_handler import AgentHandler
+from .local_transport import local_transport
+from .addresses import remove_socket_file
+from .framing import PROTOCOL_HEADER, FRAME_HEADER, encode_frame, decode_payload
+
+
+class AsyncAgentServer(Thread):
+    """
+    Serves all local agents of a scenario run on one asyncio event loop instead of one thread per agent and
+    connection. Each connection is handled as coroutine, while trust protocol requests and observations are answered
+    by bounded thread pools, as both block on reading the logs and the trust evaluation also on asking other agents.
+    Trust protocol requests have their own pool, such that they are answered even while all threads evaluating
+    observations wait for other agents' responses.
+    """
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        finally:
+            self.executor.shutdown()
+            self.request_executor.shutdown()
+            self.loop.close()
+        for handler, ip_address, port, unix_path in self.agents:
+            handler.print_cache_statistics()
+
+    async def serve(self):
+        servers = []
+        for handler, ip_address, port, unix_path in self.agents:
+            servers.append(await asyncio.start_server(partial(self.handle_connection, handler), ip_address, port,
+                                                      reuse_address=True))
+            if unix_path is not None:
+                remove_socket_file(unix_path)
+                servers.append(await asyncio.start_unix_server(partial(self.handle_connection, handler), unix_path))
+                print(f"Agent '{handler.agent}' listens on {ip_address}:{port} and {unix_path}")
+            else:
+                print(f"Agent '{handler.agent}' listens on {ip_address}:{port}")
+        await self.stopped
+        for server in servers:
+            server.close()
+        # long-lived connections of other agents' connection pools are ended by the server
+        for reader in list(self.readers):
+            reader.feed_eof()
+        for server in servers:
+            await server.wait_closed()
+        if self.connections:
+            await asyncio.gather(*self.connections, return_exceptions=True)
+        for handler, ip_address, port, unix_path in self.agents:
+            if unix_path is not None:
+                remove_socket_file(unix_path)
+
+    async def handle_connection(self, handler, reader, writer):
+        """
+        Answers all requests received as frames on one connection to the agent of `handler` like `ServerThread`,
+        where each request is answered by its own coroutine to not delay the requests pipelined after it.
+
+        :param handler: Handles the messages of the agent the connection belongs to.
+        :type handler: AgentHandler
+        :param reader: Stream of the connection to receive from.
+        :type reader: asyncio.StreamReader
+        :param writer: Stream of the connection to send to.
+        :type writer: asyncio.StreamWriter
+        :rtype: None
+        """
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        self.readers.add(reader)
+        peername = writer.get_extra_info('peername')
+        # agents at the same host connected by Unix domain socket are not distinguished by their address
+        remote = f"{peername[0]}:{peername[1]}" if isinstance(peername, tuple) else 'unix socket'
+        requests = set()
+        # responses are sent one after another, as waiting for the stream to drain is not possible concurrently
+        send_lock = asyncio.Lock()
+        try:
+            # connections without protocol header, like the one ending the server, carry no requests
+            if await reader.readexactly(len(PROTOCOL_HEADER)) == PROTOCOL_HEADER:
+                while True:
+                    length, request_id, encoding = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                    message = decode_payload(encoding, await reader.readexactly(length))
+                    request = self.loop.create_task(self.answer(handler, writer, send_lock, request_id, message,
+                                                                       remote))
+                    requests.add(request)
+                    request.add_done_callback(requests.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.readers.discard(reader)
+            if requests:
+                await asyncio.gather(*requests, return_exceptions=True)
+            writer.close()
+            self.connections.discard(connection)
+
+    async def answer(self, handler, writer, send_lock, request_id, message, remote):
+        if message.startswith("aTLAS_trust_protocol::"):
+            response = await self.loop.run_in_executor(self.request_executor, handler.trust_protocol_response,
+                                                       message, remote)
+        else:
+            response = await self.loop.run_in_executor(self.executor, handler.observation_response, message, remote)
+        async with send_lock:
+            if not writer.is_closing():
+                writer.write(encode_frame(request_id, response))
+                await writer.drain()
+
+    def add_agent(self, agent, ip_address, port, agent_behavior, scale, logger, observations_done, unix_path=None):
+        """
+        Adds a local agent to be served at `ip_address`:`port`, and at `unix_path` if given, once the server is
+        started.
+
+        :rtype: None
+        """
+        handler = AgentHandler(agent, agent_behavior, scale, logger, observations_done)
+        local_transport.register(ip_address, port, handler)
+        self.agents.append((handler, ip_address, port, unix_path))
+
+    def set_discovery(self, discovery):
+        for handler, ip_address, port, unix_path in self.agents:
+            handler.set_discovery(discovery)
+
+    def end_server(self):
+        for handler, ip_address, port, unix_path in self.agents:
+            local_transport.unregister(ip_address, port)
+        self.loop.call_soon_threadsafe(lambda: self.stopped.done() or self.stopped.set_result(None))
+
+    def __init__(self):
+        Thread.__init__(self)
+        self.agents = []
+        self.loop = asyncio.new_event_loop()
+        self.stopped = self.loop.create_future()
+        # tasks of the connections currently handled
+        self.connections = set()
+        # readers of the connections currently handled
+        self.readers = set()
+        self.executor = ThreadPoolExecutor(max_workers=AGENT_EVAL_WORKERS, thread_name_prefix="agent_eval")
+        self.request_executor = ThreadPoolExecutor(max_workers=AGENT_REQUEST_WORKERS,
+                                                   thread_name_prefix="agent_request")
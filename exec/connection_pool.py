@@ -0,0 +1,247 @@
+import socket
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from itertools import count
+from threading import Thread, Lock
+from .framing import PROTOCOL_HEADER, FrameReader, encode_frame
+
+
+class RequestNotSentError(ConnectionError):
+    """
+    Raised if a request was not sent completely to another agent, thus other agent did not receive it and it can be
+    sent once more without being answered twice.
+    """
+    pass
+
+
+class PooledConnection:
+    """
+    One long-lived connection to another agent carrying multiple requests at once as frames, where each response is
+    matched to its request by the request ID. A receiving thread resolves the outstanding requests, while all requests
+    fail with a ConnectionError once the connection is closed by either side. Other agents served at a Unix domain
+    socket are connected to by it, falling back to TCP if it is not reachable.
+    """
+    def connect(self, timeout=None):
+        """
+        Connects to the other agent at the first call and sends the protocol header.
+
+        :param timeout: Seconds to wait at most for connecting, or None to block.
+        :type timeout: float
+        :rtype: None
+        :raises OSError: The other agent is not reachable.
+        """
+        with self.connect_lock:
+            if self.closed:
+                raise ConnectionError(f"Connection to {self.remote_ip}:{self.remote_port} is closed.")
+            if self.client is not None:
+                return
+            try:
+                client = self.open_socket(timeout)
+            except OSError:
+                self.closed = True
+                raise
+            try:
+                client.settimeout(None)
+                client.sendall(PROTOCOL_HEADER)
+            except OSError:
+                client.close()
+                self.closed = True
+                raise
+            self.client = client
+            Thread(target=self.receive, name=f"pooled_connection_{self.remote_ip}:{self.remote_port}",
+                   daemon=True).start()
+
+    def open_socket(self, timeout):
+        """
+        :param timeout: Seconds to wait at most for connecting, or None to block.
+        :type timeout: float
+        :return: The socket connected to other agent by its Unix domain socket if given, else by TCP.
+        :rtype: socket.socket
+        :raises OSError: The other agent is not reachable.
+        """
+        if self.unix_path is not None:
+            unix_client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            unix_client.settimeout(timeout)
+            try:
+                unix_client.connect(self.unix_path)
+                return unix_client
+            except OSError:
+                # e.g. the socket file of an ended scenario run, while other agent may still be reachable by TCP
+                unix_client.close()
+        tcp_client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        tcp_client.settimeout(timeout)
+        try:
+            tcp_client.connect((self.remote_ip, self.remote_port))
+        except OSError:
+            tcp_client.close()
+            raise
+        return tcp_client
+
+    def request(self, message, timeout=None):
+        """
+        Sends message over the connection and returns the response to it.
+
+        :param message: Message to send to other agent.
+        :type message: str
+        :param timeout: Seconds to wait at most for connecting and the response, or None to block.
+        :type timeout: float
+        :return: Response of other agent.
+        :rtype: str
+        :raises RequestNotSentError: The other agent is not reachable or the connection was closed before sending.
+        :raises socket.timeout: The other agent did not respond within `timeout`.
+        :raises OSError: The connection was closed after sending and before the response.
+        """
+        try:
+            self.connect(timeout)
+        except OSError as error:
+            raise RequestNotSentError(f"Request to {self.remote_ip}:{self.remote_port} not sent: {error}") from error
+        response = Future()
+        with self.lock:
+            if self.closed:
+                raise RequestNotSentError(f"Connection to {self.remote_ip}:{self.remote_port} is closed.")
+            request_id = next(self.request_ids)
+            self.pending[request_id] = response
+            client = self.client
+        try:
+            try:
+                with self.send_lock:
+                    client.sendall(encode_frame(request_id, message))
+            except OSError as error:
+                # an incomplete frame is never answered by other agent
+                raise RequestNotSentError(f"Request to {self.remote_ip}:{self.remote_port} not sent: {error}") \
+                    from error
+            return response.result(timeout)
+        except FutureTimeoutError:
+            raise socket.timeout(f"{self.remote_ip}:{self.remote_port} did not respond within {timeout} s.")
+        except OSError:
+            self.close()
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(request_id, None)
+
+    def receive(self):
+        frame_reader = FrameReader(self.client)
+        try:
+            while True:
+                frames = frame_reader.read_frames()
+                if not frames:
+                    break
+                for request_id, message in frames:
+                    with self.lock:
+                        response = self.pending.get(request_id)
+                    # responses to requests that timed out are dropped
+                    if response is not None and not response.done():
+                        response.set_result(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        with self.lock:
+            if self.closed and self.client is None:
+                return
+            self.closed = True
+            client, self.client = self.client, None
+            pending, self.pending = self.pending, {}
+        if client is not None:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+        for response in pending.values():
+            if not response.done():
+                response.set_exception(ConnectionError(f"Connection to {self.remote_ip}:{self.remote_port} closed."))
+
+    def __init__(self, remote_ip, remote_port, unix_path=None):
+        """
+        :param remote_ip: IP address of other agent.
+        :type remote_ip: str
+        :param remote_port: TCP port of other agent.
+        :type remote_port: int
+        :param unix_path: Path of the Unix domain socket of other agent at the same host, if any.
+        :type unix_path: str
+        """
+        self.remote_ip = remote_ip
+        self.remote_port = remote_port
+        self.unix_path = unix_path
+        self.client = None
+        self.closed = False
+        self.request_ids = count()
+        # outstanding requests by their ID
+        self.pending = {}
+        self.lock = Lock()
+        self.send_lock = Lock()
+        self.connect_lock = Lock()
+
+
+class ConnectionPool:
+    """
+    Keeps one long-lived connection per agent address for all agents of the scenario run's process, such that
+    requests to other agents do not open a new connection each. Closed connections are replaced at the next request.
+    Unix domain sockets of other agents are used only if other agent is served at the same IP address as the process'
+    agents, thus at a supervisor of the same host.
+    """
+    def connection(self, remote_ip, remote_port, unix_path=None):
+        """
+        :param remote_ip: IP address of other agent.
+        :type remote_ip: str
+        :param remote_port: TCP port of other agent.
+        :type remote_port: int
+        :param unix_path: Path of the Unix domain socket of other agent, if any.
+        :type unix_path: str
+        :return: The open or not yet connected connection to other agent.
+        :rtype: PooledConnection
+        """
+        if remote_ip != self.ip_address:
+            unix_path = None
+        with self.lock:
+            connection = self.connections.get((remote_ip, remote_port))
+            if connection is None or connection.closed:
+                connection = PooledConnection(remote_ip, remote_port, unix_path)
+                self.connections[(remote_ip, remote_port)] = connection
+            return connection
+
+    def request(self, remote_ip, remote_port, message, timeout=None, unix_path=None):
+        """
+        Sends message to other agent over the pooled connection and returns the response.
+
+        :param remote_ip: IP address of other agent.
+        :type remote_ip: str
+        :param remote_port: TCP port of other agent.
+        :type remote_port: int
+        :param message: Message to send to other agent.
+        :type message: str
+        :param timeout: Seconds to wait at most for connecting and the response, or None to block.
+        :type timeout: float
+        :param unix_path: Path of the Unix domain socket of other agent, if any.
+        :type unix_path: str
+        :return: Response of other agent.
+        :rtype: str
+        :raises RequestNotSentError: The other agent is not reachable or the connection was closed before sending.
+        :raises socket.timeout: The other agent did not respond within `timeout`.
+        :raises OSError: The connection was closed after sending and before the response.
+        """
+        return self.connection(remote_ip, remote_port, unix_path).request(message, timeout)
+
+    def close(self):
+        """
+        Closes all pooled connections, e.g. at the end of the scenario run.
+
+        :rtype: None
+        """
+        with self.lock:
+            connections, self.connections = list(self.connections.values()), {}
+        for connection in connections:
+            connection.close()
+
+    def __init__(self):
+        self.connections = {}
+        self.lock = Lock()
+        # IP address the agents of the scenario run's process are served at, set once their servers are created
+        self.ip_address = None
+
+
+# connections of all agents of the scenario run's process to other agents
+connection_pool = ConnectionPool()
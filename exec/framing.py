@@ -0,0 +1,133 @@
+import struct
+import zlib
+from config import BUFFER_SIZE, FRAME_COMPRESSION_THRESHOLD
+
+# sent once at the start of each connection between agents, followed by frames in both directions
+PROTOCOL_HEADER = b"aTLAS_frames_v1\n"
+# each frame starts with the payload's length in bytes, the request ID and the payload's encoding
+FRAME_HEADER = struct.Struct('!IIB')
+ENCODING_UTF8 = 0
+ENCODING_ZLIB = 1
+
+
+def encode_frame(request_id, message, compression_threshold=FRAME_COMPRESSION_THRESHOLD):
+    """
+    :param request_id: The ID of the request within its connection, which the response to it repeats.
+    :type request_id: int
+    :param message: The request or response message of any length.
+    :type message: str
+    :param compression_threshold: Minimum payload size in bytes to send the payload zlib compressed, or None to
+    never compress.
+    :type compression_threshold: int
+    :return: The frame of `message` as sent on a connection between agents.
+    :rtype: bytes
+    """
+    payload = message.encode('utf-8')
+    encoding = ENCODING_UTF8
+    if compression_threshold is not None and len(payload) >= compression_threshold:
+        payload = zlib.compress(payload)
+        encoding = ENCODING_ZLIB
+    return FRAME_HEADER.pack(len(payload), request_id, encoding) + payload
+
+
+def decode_payload(encoding, payload):
+    """
+    :param encoding: The encoding of the payload as given in its frame header.
+    :type encoding: int
+    :param payload: The payload of one frame.
+    :type payload: bytes or memoryview
+    :return: The message of the frame.
+    :rtype: str
+    :raises ValueError: The encoding is unknown.
+    """
+    if encoding == ENCODING_ZLIB:
+        payload = zlib.decompress(payload)
+    elif encoding != ENCODING_UTF8:
+        raise ValueError(f"Unknown frame encoding {encoding}.")
+    return str(payload, 'utf-8')
+
+
+def receive_header(connection):
+    """
+    Receives the protocol header at the start of a connection.
+
+    :param connection: The connected socket.
+    :type connection: socket.socket
+    :return: Whether the connection starts with the protocol header, thus carries frames.
+    :rtype: bool
+    """
+    received = b""
+    while len(received) < len(PROTOCOL_HEADER):
+        data = connection.recv(len(PROTOCOL_HEADER) - len(received))
+        if not data:
+            return False
+        received += data
+    return received == PROTOCOL_HEADER
+
+
+class FrameReader:
+    """
+    Reads the frames of one connection into a buffer reused for all frames, which grows to the largest frame
+    received, such that payloads of any size are read without copying them between receives.
+    """
+    def read_frames(self):
+        """
+        Blocks until at least one complete frame is received and returns all complete frames received.
+
+        :return: The (request_id, message) of each frame in order of receiving, or an empty list once the connection
+        is closed by the other side.
+        :rtype: list
+        :raises OSError: The connection failed.
+        """
+        while True:
+            frames = self.parse_frames()
+            if frames:
+                return frames
+            with memoryview(self.buffer) as view:
+                received = self.connection.recv_into(view[self.end:])
+            if received == 0:
+                return []
+            self.end += received
+
+    def parse_frames(self):
+        frames = []
+        while self.end - self.start >= FRAME_HEADER.size:
+            length, request_id, encoding = FRAME_HEADER.unpack_from(self.buffer, self.start)
+            frame_end = self.start + FRAME_HEADER.size + length
+            if frame_end > self.end:
+                break
+            with memoryview(self.buffer) as view:
+                frames.append((request_id, decode_payload(encoding, view[self.start + FRAME_HEADER.size:frame_end])))
+            self.start = frame_end
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif len(self.buffer) - self.start < self.frame_size():
+            # the incomplete frame is moved to the front, and the buffer grows only if the frame does not fit at all
+            remaining = self.end - self.start
+            self.buffer[:remaining] = self.buffer[self.start:self.end]
+            self.start, self.end = 0, remaining
+            if len(self.buffer) < self.frame_size():
+                self.buffer.extend(bytes(self.frame_size() - len(self.buffer)))
+        return frames
+
+    def frame_size(self):
+        """
+        :return: The size of the incomplete frame at the start of the buffer, as far as its header is received.
+        :rtype: int
+        """
+        if self.end - self.start < FRAME_HEADER.size:
+            return FRAME_HEADER.size
+        return FRAME_HEADER.size + FRAME_HEADER.unpack_from(self.buffer, self.start)[0]
+
+    def __init__(self, connection, buffer_size=BUFFER_SIZE):
+        """
+        :param connection: The connected socket to read from, after its protocol header was received.
+        :type connection: socket.socket
+        :param buffer_size: The initial size of the buffer in bytes.
+        :type buffer_size: int
+        """
+        self.connection = connection
+        self.buffer = bytearray(buffer_size)
+        # the received and not yet parsed bytes are buffer[start:end]
+        self.start = 0
+        self.end = 0
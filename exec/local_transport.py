@@ -0,0 +1,85 @@
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from config import AGENT_EVAL_WORKERS
+
+
+class LocalTransport:
+    """
+    Delivers messages to the agents served within the scenario run's process directly to their handlers, such that
+    observations and trust protocol requests between agents at the same supervisor need no sockets. Agents are
+    looked up by their address in the discovery, thus agents at other supervisors are still reached over the network.
+    """
+    def register(self, ip_address, port, handler):
+        """
+        :param ip_address: IP address the agent is served at.
+        :type ip_address: str
+        :param port: Port the agent is served at.
+        :type port: int
+        :param handler: Handles the messages of the agent.
+        :type handler: AgentHandler
+        :rtype: None
+        """
+        with self.lock:
+            self.handlers[(ip_address, int(port))] = handler
+
+    def unregister(self, ip_address, port):
+        with self.lock:
+            self.handlers.pop((ip_address, int(port)), None)
+
+    def handler(self, remote_ip, remote_port):
+        """
+        :param remote_ip: IP address of other agent.
+        :type remote_ip: str
+        :param remote_port: Port of other agent.
+        :type remote_port: int
+        :return: The handler of other agent if served within this process, or None.
+        :rtype: AgentHandler or None
+        """
+        return self.handlers.get((remote_ip, int(remote_port)))
+
+    def deliver(self, handler, observation):
+        """
+        Evaluates `observation` by the receiving agent's handler with a thread of the transport's pool, such that
+        the delivery does not block the sender like sending it over the network.
+
+        :param handler: Handles the messages of the receiving agent.
+        :type handler: AgentHandler
+        :param observation: The observation to deliver.
+        :type observation: Observation
+        :return: The future of the receiving agent's response.
+        :rtype: concurrent.futures.Future
+        """
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=AGENT_EVAL_WORKERS, thread_name_prefix="local_delivery")
+        delivery = self.executor.submit(handler.evaluate_observation, observation, 'local')
+        delivery.add_done_callback(self.print_failure)
+        return delivery
+
+    @staticmethod
+    def print_failure(delivery):
+        if not delivery.cancelled() and delivery.exception() is not None:
+            traceback.print_exception(type(delivery.exception()), delivery.exception(),
+                                      delivery.exception().__traceback__)
+
+    def close(self):
+        """
+        Waits for all observations delivered to be evaluated, e.g. at the end of the scenario run.
+
+        :rtype: None
+        """
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __init__(self):
+        # handlers of the agents served within this process by their (ip_address, port)
+        self.handlers = {}
+        self.lock = Lock()
+        self.executor = None
+
+
+# agents served within the scenario run's process
+local_transport = LocalTransport()
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from threading import Lock
+from loggers.basic_logger import BasicLogger
+from config import RESPONSE_CACHE_MAX_ENTRIES
+
+
+class ResponseCache:
+    """
+    Caches the answers of one agent to the trust protocol operations of other agents by operation, resource ID and
+    recency limit. An answer is valid as long as the agent did not write new history about the resource, which is
+    checked with the history version of the logger. Outdated answers are dropped once looked up, and the least
+    recently used answers are dropped if more than RESPONSE_CACHE_MAX_ENTRIES would be cached.
+    """
+    def version(self, resource_id):
+        """
+        :param resource_id: The ID of the resource an answer refers to.
+        :type resource_id: str
+        :return: The current version of the agent's history about the resource.
+        :rtype: int
+        """
+        return self.logger.read_history_version(self.agent, resource_id)
+
+    def lookup(self, operation, resource_id, recency_limit, version):
+        """
+        Returns the cached answer if it was calculated from the history at `version` and counts the hit or miss.
+
+        :param operation: The trust protocol operation answered.
+        :type operation: str
+        :param resource_id: The ID of the resource the answer refers to.
+        :type resource_id: str
+        :param recency_limit: The recency limit of the answer.
+        :type recency_limit: datetime
+        :param version: The current version of the agent's history about the resource.
+        :type version: int
+        :return: Whether the answer is cached and the answer or None.
+        :rtype: tuple
+        """
+        with self.lock:
+            key = (operation, resource_id, recency_limit)
+            entry = self.answers.get(key)
+            if entry is not None and entry[0] == version:
+                self.answers.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self.answers[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, operation, resource_id, recency_limit, version, answer):
+        """
+        Caches `answer`, which has to be calculated from the history at `version` read before the calculation.
+
+        :param operation: The trust protocol operation answered.
+        :type operation: str
+        :param resource_id: The ID of the resource the answer refers to.
+        :type resource_id: str
+        :param recency_limit: The recency limit of the answer.
+        :type recency_limit: datetime
+        :param version: The version of the agent's history about the resource before calculating the answer.
+        :type version: int
+        :param answer: The answer to cache.
+        :rtype: None
+        """
+        with self.lock:
+            key = (operation, resource_id, recency_limit)
+            self.answers[key] = (version, answer)
+            self.answers.move_to_end(key)
+            while len(self.answers) > RESPONSE_CACHE_MAX_ENTRIES:
+                self.answers.popitem(last=False)
+
+    def response(self, operation, resource_id, recency_limit, calculate):
+        """
+        Returns the cached answer or calculates and caches it.
+
+        :param operation: The trust protocol operation answered.
+        :type operation: str
+        :param resource_id: The ID of the resource the answer refers to.
+        :type resource_id: str
+        :param recency_limit: The recency limit of the answer.
+        :type recency_limit: datetime
+        :param calculate: Function without parameters calculating the answer.
+        :type calculate: Callable
+        :return: The answer.
+        """
+        version = self.version(resource_id)
+        cached, answer = self.lookup(operation, resource_id, recency_limit, version)
+        if not cached:
+            answer = calculate()
+            self.store(operation, resource_id, recency_limit, version, answer)
+        return answer
+
+    def __init__(self, agent, logger):
+        """
+        :param agent: The agent which answers.
+        :type agent: str
+        :param logger: The logger object to be used by the agent.
+        :type logger: BasicLogger
+        """
+        self.agent = agent
+        self.logger = logger
+        # answers ordered by their last use
+        self.answers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
@@ -0,0 +1,164 @@
+import argparse
+import importlib
+import re
+import sys
+import zipfile
+from array import array
+from loggers.basic_logger import BasicLogger
+
+
+class Exporter:
+    """
+    Converts the logs of a finished scenario run into columnar arrays stored as one compressed NumPy `.npz` archive,
+    which is loaded for analysis with `numpy.load` without parsing any log line. The archive is written without
+    requiring NumPy. Each log is one table of columns named `<table>.<column>`, where times, execution times and trust
+    values are float columns with NaN for missing values. All agent, resource, metric and topic columns are dictionary
+    encoded as int32 codes into the one string column `strings`.
+    """
+    tables = {
+        'trust_log': ('date_time', 'agent', 'other_agent', 'resource_id', 'exec_time', 'trust_value'),
+        'agent_trust_log': ('agent', 'date_time', 'metric_str', 'other_agent', 'resource_id', 'trust_value'),
+        'history': ('agent', 'date_time', 'other_agent', 'resource_id', 'trust_value'),
+        'topic': ('agent', 'date_time', 'other_agent', 'resource_id', 'topic', 'trust_value'),
+    }
+
+    float_columns = ('date_time', 'exec_time', 'trust_value')
+
+    def table_lines(self, table):
+        """
+        :param table: Name of the table as key of `tables`.
+        :type table: str
+        :return: The log entries of the table with the agent they belong to at 'agent'.
+        :rtype: Iterator[dict]
+        """
+        if table == 'trust_log':
+            yield from self.logger.iter_lines_from_trust_log()
+            return
+        for agent in self.agents:
+            if table == 'agent_trust_log':
+                lines = self.logger.iter_lines_from_agent_trust_log(agent)
+            elif table == 'history':
+                lines = self.logger.read_lines_from_agent_history(agent)
+            else:
+                lines = self.logger.read_lines_from_agent_topic_trust(agent)
+            for entry in lines:
+                yield dict(entry, agent=agent)
+
+    def string_code(self, value):
+        """
+        :param value: Value of a dictionary encoded column.
+        :type value: str or None
+        :return: The index of `value` in the string column, where None is encoded as -1.
+        :rtype: int
+        """
+        if value is None:
+            return -1
+        value = str(value)
+        if value not in self.string_codes:
+            self.string_codes[value] = len(self.strings)
+            self.strings.append(value)
+        return self.string_codes[value]
+
+    def table_columns(self, table):
+        """
+        :param table: Name of the table as key of `tables`.
+        :type table: str
+        :return: The columns of the table by their name as float or int32 arrays.
+        :rtype: dict
+        """
+        columns = {column: array('d') if column in self.float_columns else array('i') for column in self.tables[table]}
+        for entry in self.table_lines(table):
+            for column, values in columns.items():
+                value = entry.get(column)
+                if column in self.float_columns:
+                    values.append(float(value) if value is not None else float('nan'))
+                else:
+                    values.append(self.string_code(value))
+        return columns
+
+    @staticmethod
+    def npy_bytes(descr, shape, data):
+        """
+        Encodes an array in the NumPy `.npy` format version 1.0.
+
+        :param descr: NumPy type description of the array's items.
+        :type descr: str
+        :param shape: Shape of the array.
+        :type shape: tuple
+        :param data: Items of the array in C order.
+        :type data: bytes
+        :rtype: bytes
+        """
+        header = repr({'descr': descr, 'fortran_order': False, 'shape': shape})
+        # the header is padded such that the data starts 64-byte aligned
+        header += " " * (63 - (10 + len(header)) % 64) + "\n"
+        return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1') + data
+
+    @staticmethod
+    def array_npy_bytes(values):
+        """
+        :param values: Float or int32 array of a column.
+        :type values: array
+        :return: The column in the NumPy `.npy` format.
+        :rtype: bytes
+        """
+        byte_order = '<' if sys.byteorder == 'little' else '>'
+        descr = f"{byte_order}f8" if values.typecode == 'd' else f"{byte_order}i{values.itemsize}"
+        return Exporter.npy_bytes(descr, (len(values),), values.tobytes())
+
+    @staticmethod
+    def strings_npy_bytes(strings):
+        """
+        :param strings: Values of the string column.
+        :type strings: list
+        :return: The string column in the NumPy `.npy` format as fixed width unicode array.
+        :rtype: bytes
+        """
+        width = max([len(string) for string in strings] + [1])
+        data = b''.join(string.encode('utf-32-le').ljust(width * 4, b'\x00') for string in strings)
+        return Exporter.npy_bytes(f"<U{width}", (len(strings),), data)
+
+    def export(self, archive_path):
+        """
+        Writes all logs of the scenario run as columns to the compressed archive at `archive_path`.
+
+        :param archive_path: File the archive is written to.
+        :type archive_path: Path
+        :rtype: None
+        """
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for table in self.tables:
+                for column, values in self.table_columns(table).items():
+                    archive.writestr(f"{table}.{column}.npy", self.array_npy_bytes(values))
+            archive.writestr("strings.npy", self.strings_npy_bytes(self.strings))
+
+    def __init__(self, logger, agents=None):
+        """
+        :param logger: The logger of the finished scenario run.
+        :type logger: BasicLogger
+        :param agents: Agents whose logs are exported, or None for all agents found in the logs.
+        :type agents: list
+        """
+        self.logger = logger
+        self.agents = agents if agents else logger.read_logged_agents()
+        self.strings = []
+        self.string_codes = {}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("-log", "--logger", default="FileLogger", choices=['FileLogger', 'SqliteLogger'],
+                        help="The logger class the scenario run was logged with, where MemoryLogger runs are exported "
+                             "as FileLogger runs.")
+    parser.add_argument("-a", "--agents", nargs='*', default=None,
+                        help="The agents whose logs are exported. All agents found in the logs are exported if not "
+                             "given.")
+    parser.add_argument("-o", "--output", default="logs.npz",
+                        help="The file name of the archive within the scenario run's log folder.")
+    parser.add_argument("scenario_run_id", help="The ID of the finished scenario run, e.g. 'scenarioRun_...'.")
+    args = parser.parse_args()
+    module = importlib.import_module("loggers." + re.sub("([A-Z])", "_\g<1>", args.logger).lower()[1:])
+    logger_class = getattr(module, args.logger)
+    run_logger = logger_class(args.scenario_run_id)
+    Exporter(run_logger, args.agents).export(run_logger.log_path / args.output)
+    run_logger.close()
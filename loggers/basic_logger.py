@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from threading import Lock
+import time
 from models import Observation
 
 
@@ -8,6 +10,9 @@ class BasicLogger(ABC):
     Provides the abstract class for any logger class to interface the logs and provide functionalities to
     read and write the logs' data lines.
     """
+    # whether the filtered reads are answered from indices instead of reading all lines of a log
+    indexed_reads = False
+
     @staticmethod
     @abstractmethod
     def apply_len_filter(lines, len_filter):
@@ -102,6 +107,337 @@ class BasicLogger(ABC):
         """
         pass
 
+    @abstractmethod
+    def read_lines_from_agent_trust_log_since(self, agent, cursor=None):
+        """
+        Reads in the `agent`'s trust log lines appended after `cursor`, where return is the list of dicts representing
+        information per line together with the cursor after the last returned line.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param cursor: Cursor returned by the previous call, or None to read from the start of the log.
+        :type cursor: int
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def read_lines_from_trust_log_since(self, cursor=None):
+        """
+        Reads in the supervisor's local trust log lines appended after `cursor`, where return is the list of dicts
+        representing information per line together with the cursor after the last returned line.
+
+        :param cursor: Cursor returned by the previous call, or None to read from the start of the log.
+        :type cursor: int
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def read_logged_agents(self):
+        """
+        Returns the names of all agents having any history, topic trust or trust log lines in the scenario run's logs.
+
+        :rtype: list
+        """
+        pass
+
+    def iter_lines_from_agent_trust_log(self, agent, match=None):
+        """
+        Iterates the `agent`'s trust log lines which hold all values of `match` if given, yielding dicts representing
+        information per line. Logger classes should override this default to not hold all lines in memory at once.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param match: Values the yielded lines have to hold at their keys.
+        :type match: dict
+        :rtype: Iterator[dict]
+        """
+        return self.match_lines(self.read_lines_from_agent_trust_log(agent), match)
+
+    def iter_lines_from_trust_log(self, match=None):
+        """
+        Iterates the supervisor's local trust log lines which hold all values of `match` if given, yielding dicts
+        representing information per line. Logger classes should override this default to not hold all lines in
+        memory at once.
+
+        :param match: Values the yielded lines have to hold at their keys.
+        :type match: dict
+        :rtype: Iterator[dict]
+        """
+        return self.match_lines(self.read_lines_from_trust_log(), match)
+
+    @staticmethod
+    def match_lines(lines, match):
+        """
+        :param lines: Data lines to filter.
+        :type lines: Iterable[dict]
+        :param match: Values the lines have to hold at their keys, or None to keep all lines.
+        :type match: dict
+        :return: The lines holding all values of `match`.
+        :rtype: Iterator[dict]
+        """
+        match = match if match else {}
+        return (entry for entry in lines if all(entry.get(key) == value for key, value in match.items()))
+
+    def read_lines_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        """
+        Reads in the `agent`'s history log lines which refer to the resource `resource_id` and are newer than
+        `recency_limit` if given, where return is list of dicts representing information per line.
+        Logger classes with an index over the history should override this default scan.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param resource_id: The ID of the resource the lines have to refer to.
+        :type resource_id: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :rtype: list
+        """
+        return [entry for entry in self.filter_recency(self.read_lines_from_agent_history(agent), recency_limit)
+                if entry['resource_id'] == resource_id]
+
+    def read_lines_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        """
+        Reads in the `agent`'s history log lines which refer to `other_agent` and are newer than
+        `recency_limit` if given, where return is list of dicts representing information per line.
+        Logger classes with an index over the history should override this default scan.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param other_agent: The agent the lines have to refer to.
+        :type other_agent: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :rtype: list
+        """
+        return [entry for entry in self.filter_recency(self.read_lines_from_agent_history(agent), recency_limit)
+                if entry['other_agent'] == other_agent]
+
+    def read_lines_from_agent_topic_trust_by_other_agent(self, agent, other_agent, recency_limit=None):
+        """
+        Reads in the `agent`'s topic trust log lines which refer to `other_agent` and are newer than
+        `recency_limit` if given, where return is list of dicts representing information per line.
+        Logger classes with an index over the topic trust should override this default scan.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param other_agent: The agent the lines have to refer to.
+        :type other_agent: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :rtype: list
+        """
+        return [entry for entry in self.filter_recency(self.read_lines_from_agent_topic_trust(agent), recency_limit)
+                if entry['other_agent'] == other_agent]
+
+    def read_lines_from_agent_topic_trust_by_topic(self, agent, topic, recency_limit=None):
+        """
+        Reads in the `agent`'s topic trust log lines which refer to `topic` and are newer than
+        `recency_limit` if given, where return is list of dicts representing information per line.
+        Logger classes with an index over the topic trust should override this default scan.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param topic: The topic the lines have to refer to.
+        :type topic: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :rtype: list
+        """
+        return [entry for entry in self.filter_recency(self.read_lines_from_agent_topic_trust(agent), recency_limit)
+                if entry['topic'] == topic]
+
+    def read_lines_from_agent_history_by_resources(self, agent, resource_ids, recency_limit=None):
+        """
+        Reads in the `agent`'s history log lines which refer to any of the resources `resource_ids` and are newer than
+        `recency_limit` if given in one pass, where return is a dict of the lines per resource ID.
+
+        :param agent: Agent to read log data lines about.
+        :type agent: str
+        :param resource_ids: The IDs of the resources the lines have to refer to.
+        :type resource_ids: list
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The list of dicts representing information per line in order of writing by each resource ID.
+        :rtype: dict
+        """
+        lines = {resource_id: [] for resource_id in resource_ids}
+        for entry in self.filter_recency(self.read_lines_from_agent_history(agent), recency_limit):
+            if entry['resource_id'] in lines:
+                lines[entry['resource_id']].append(entry)
+        return lines
+
+    def read_mean_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        """
+        Returns the mean of the `agent`'s history values about the resource with ID `resource_id`, considering only
+        lines newer than `recency_limit` if given.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param resource_id: The URI of the resource the lines have to refer to.
+        :type resource_id: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The mean of all set history values, or None if there are none.
+        :rtype: float or None
+        """
+        return self.mean_trust_value(self.read_lines_from_agent_history_by_resource(agent, resource_id, recency_limit))
+
+    def read_mean_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        """
+        Returns the mean of the `agent`'s history values about `other_agent`, considering only lines newer than
+        `recency_limit` if given.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param other_agent: Agent the lines have to refer to.
+        :type other_agent: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The mean of all set history values, or None if there are none.
+        :rtype: float or None
+        """
+        return self.mean_trust_value(self.read_lines_from_agent_history_by_other_agent(agent, other_agent,
+                                                                                        recency_limit))
+
+    def read_means_from_agent_history_per_other_agent(self, agent, recency_limit=None):
+        """
+        Returns the means of the `agent`'s history values grouped by the other agent in one pass over the history,
+        considering only lines newer than `recency_limit` if given.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The mean of all set history values by the other agent they refer to, without other agents having none.
+        :rtype: dict
+        """
+        totals = {}
+        for entry in self.filter_recency(self.read_lines_from_agent_history(agent), recency_limit):
+            if entry['trust_value'] is not None:
+                total, count = totals.get(entry['other_agent'], (0, 0))
+                totals[entry['other_agent']] = (total + entry['trust_value'], count + 1)
+        return {other_agent: total / count for other_agent, (total, count) in totals.items()}
+
+    def read_topic_trust_sums_by_other_agent(self, agent, other_agent, topics, recency_limit=None):
+        """
+        Returns the sum and count of the `agent`'s topic trust values about `other_agent` per topic of `topics`,
+        considering only lines newer than `recency_limit` if given.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param other_agent: Agent the lines have to refer to.
+        :type other_agent: str
+        :param topics: The topics to sum the values of.
+        :type topics: list
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The (sum, count) of all set topic trust values by topic, without topics having none.
+        :rtype: dict
+        """
+        return self.topic_trust_sums(self.read_lines_from_agent_topic_trust_by_other_agent(agent, other_agent,
+                                                                                           recency_limit), topics)
+
+    def read_topic_experts(self, agent, topics, minimum, recency_limit=None):
+        """
+        Returns the other agents which the `agent` trusts on any of `topics` with at least `minimum` in one of its
+        topic trust log lines newer than `recency_limit` if given.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param topics: The topics the lines have to refer to.
+        :type topics: list
+        :param minimum: The minimum topic trust value of an expert.
+        :type minimum: float or int
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The experts without duplicates.
+        :rtype: list
+        """
+        return self.topic_experts([entry for topic in topics
+                                   for entry in self.read_lines_from_agent_topic_trust_by_topic(agent, topic,
+                                                                                                recency_limit)],
+                                  minimum)
+
+    @staticmethod
+    def topic_trust_sums(lines, topics):
+        """
+        :param lines: Topic trust data lines.
+        :type lines: list
+        :param topics: The topics to sum the values of.
+        :type topics: list
+        :return: The (sum, count) of all set trust values of `lines` by topic of `topics`, without topics having none.
+        :rtype: dict
+        """
+        sums = {}
+        for entry in lines:
+            if entry['trust_value'] is not None and entry['topic'] in topics:
+                total, count = sums.get(entry['topic'], (0, 0))
+                sums[entry['topic']] = (total + entry['trust_value'], count + 1)
+        return sums
+
+    @staticmethod
+    def topic_experts(lines, minimum):
+        """
+        :param lines: Topic trust data lines.
+        :type lines: list
+        :param minimum: The minimum topic trust value of an expert.
+        :type minimum: float or int
+        :return: The other agents of `lines` with a trust value of at least `minimum` without duplicates.
+        :rtype: list
+        """
+        return list(dict.fromkeys(entry['other_agent'] for entry in lines
+                                  if entry['trust_value'] is not None and entry['trust_value'] >= minimum))
+
+    @staticmethod
+    def mean_trust_value(lines):
+        """
+        :param lines: Data lines with their trust value at 'trust_value'.
+        :type lines: list
+        :return: The mean of all set trust values, or None if there are none.
+        :rtype: float or None
+        """
+        values = [entry['trust_value'] for entry in lines if entry['trust_value'] is not None]
+        return sum(values) / len(values) if len(values) > 0 else None
+
+    @staticmethod
+    def filter_recency(lines, recency_limit):
+        """
+        Filters data lines to those newer than `recency_limit`. As logs are appended in time order, the first line
+        newer than `recency_limit` is found by binary search and only the lines from there on are copied.
+
+        :param lines: Data lines in time order with their epoch timestamp at 'date_time'.
+        :type lines: list
+        :param recency_limit: Lines have to be newer than this point in time, or None to keep all lines.
+        :type recency_limit: datetime
+        :return: A new list of the lines newer than `recency_limit`.
+        :rtype: list
+        """
+        if recency_limit is None:
+            return list(lines)
+        return lines[BasicLogger.recency_index(lines, recency_limit.timestamp()):]
+
+    @staticmethod
+    def recency_index(lines, recency_timestamp):
+        """
+        :param lines: Data lines in time order with their epoch timestamp at 'date_time'.
+        :type lines: list
+        :param recency_timestamp: Epoch timestamp lines have to be newer than.
+        :type recency_timestamp: float
+        :return: The index of the first line newer than `recency_timestamp`, or the number of lines if there is none.
+        :rtype: int
+        """
+        # bisect does not support a key function before Python 3.10
+        low, high = 0, len(lines)
+        while low < high:
+            middle = (low + high) // 2
+            if lines[middle]['date_time'] > recency_timestamp:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
     @abstractmethod
     def write_to_agent_history(self, agent, other_agent, history_value, resource_id=None):
         """
@@ -217,15 +553,268 @@ class BasicLogger(ABC):
         """
         pass
 
+    def close(self):
+        """
+        Writes out all pending log data lines and releases the resources held by the logger at scenario end.
+
+        :rtype: None
+        """
+        pass
+
+    def key_lock(self, key):
+        """
+        Returns the lock guarding the log data of `key`, such as one log file or one agent, within the scenario run's
+        process. Thus, agents of the scenario run read and write different logs in parallel.
+
+        :param key: Hashable identifier of the guarded log data.
+        :rtype: Lock
+        """
+        with self.locks_lock:
+            if key not in self.locks:
+                self.locks[key] = Lock()
+            return self.locks[key]
+
+    def read_history_version(self, agent, resource_id):
+        """
+        Returns the number of writes to the `agent`'s history about the resource `resource_id` within this process,
+        such that values calculated from the history are known to be outdated once the version changed.
+
+        :param agent: Agent whose history is versioned.
+        :type agent: str
+        :param resource_id: The ID of the resource the history refers to.
+        :type resource_id: str
+        :rtype: int
+        """
+        return self.history_versions.get((agent, resource_id), 0)
+
+    def count_history_writes(self, agent, records):
+        """
+        Increments the versions of the `agent`'s history about all resources of `records`. Has to be called after the
+        records are written, such that a value read after the new version is calculated with the records.
+
+        :param agent: Agent whose history was written.
+        :type agent: str
+        :param records: The written history entries.
+        :type records: list
+        :rtype: None
+        """
+        with self.key_lock(('history_versions', agent)):
+            for resource_id in set(record['resource_id'] for record in records):
+                self.history_versions[(agent, resource_id)] = self.read_history_version(agent, resource_id) + 1
+
+    @staticmethod
+    def history_items(history, resource_id=None):
+        """
+        Flattens a history given as list of [other_agent, resource_id, history_value] entries or as dict with other
+        agents as keys and their trust values as dict values to (other_agent, resource_id, history_value) tuples.
+
+        :param history: History to flatten.
+        :type history: list or dict
+        :param resource_id: The ID of a resource to (dis)trust in, used if `history` is a dict.
+        :type resource_id: str
+        :rtype: list
+        :raises TypeError: `history` is neither list nor dict.
+        """
+        if type(history) == list:
+            return [(entry[0], entry[1], entry[2]) for entry in history]
+        elif type(history) == dict:
+            return [(other_agent, resource_id, history_value) for other_agent, history_value in history.items()]
+        raise TypeError("Unexpected type for History object")
+
+    @staticmethod
+    def topic_trust_items(topic_trust):
+        """
+        Flattens topic trusts with {other_agent: {topic: trust_value}} to (other_agent, topic, trust_value) tuples.
+
+        :param topic_trust: Topic trusts to flatten.
+        :type topic_trust: dict
+        :rtype: list
+        """
+        return [(other_agent, topic, topic_value) for other_agent, topic_dict in topic_trust.items() if topic_dict
+                for topic, topic_value in topic_dict.items()]
+
+    @staticmethod
+    def history_record(other_agent, history_value, resource_id=None):
+        """
+        :param other_agent: Agent the history value is about.
+        :type other_agent: str
+        :param history_value: Trust value.
+        :type history_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :return: The current entry of an agent's history log with its time as epoch timestamp.
+        :rtype: dict
+        """
+        return {'date_time': BasicLogger.get_current_time(), 'other_agent': other_agent, 'resource_id': resource_id,
+                'trust_value': history_value}
+
+    @staticmethod
+    def topic_record(other_agent, topic, topic_value, resource_id=None):
+        """
+        :param other_agent: Agent the topic value is about.
+        :type other_agent: str
+        :param topic: Topic which trust value is related to.
+        :type topic: str
+        :param topic_value: Trust value.
+        :type topic_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :return: The current entry of an agent's topic trust log with its time as epoch timestamp.
+        :rtype: dict
+        """
+        return {'date_time': BasicLogger.get_current_time(), 'other_agent': other_agent, 'resource_id': resource_id,
+                'topic': topic, 'trust_value': topic_value}
+
+    @staticmethod
+    def message_record(observation):
+        """
+        :param observation: Observation received.
+        :type observation: Observation
+        :return: The current entry of an agent's message log with its time as epoch timestamp.
+        :rtype: dict
+        """
+        return {'date_time': BasicLogger.get_current_time(), 'receiver': observation.receiver,
+                'sender': observation.sender, 'observation_id': observation.observation_id,
+                'message': observation.message}
+
+    @staticmethod
+    def trust_log_record(agent, other_agent, trust_value, resource_id=None, exec_time=None):
+        """
+        :param agent: Agent which trusts.
+        :type agent: str
+        :param other_agent: Agent which is trusted.
+        :type other_agent: str
+        :param trust_value: Trust value.
+        :type trust_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :param exec_time: The time duration in seconds the trust value required to get calculated.
+        :type exec_time: float
+        :return: The current entry of the trust log with its time as epoch timestamp.
+        :rtype: dict
+        """
+        return {'date_time': BasicLogger.get_current_time(), 'agent': agent, 'other_agent': other_agent,
+                'resource_id': resource_id, 'exec_time': exec_time, 'trust_value': trust_value}
+
+    @staticmethod
+    def agent_trust_log_record(metric_str, other_agent, trust_value, resource_id=None):
+        """
+        :param metric_str: Name of metric trust value is related to.
+        :type metric_str: str
+        :param other_agent: Agent the trust value is about.
+        :type other_agent: str
+        :param trust_value: Trust value.
+        :type trust_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :return: The current entry of an agent's trust log with its time as epoch timestamp.
+        :rtype: dict
+        """
+        return {'date_time': BasicLogger.get_current_time(), 'metric_str': metric_str, 'other_agent': other_agent,
+                'resource_id': resource_id, 'trust_value': trust_value}
+
+    @staticmethod
+    def trust_log_line(date_time, agent, other_agent, trust_value, resource_id=None, exec_time=None):
+        """
+        Formats one line of the trust log.
+
+        :param date_time: Formatted time of the log entry.
+        :type date_time: str
+        :param agent: Agent which trusts.
+        :type agent: str
+        :param other_agent: Agent which is trusted.
+        :type other_agent: str
+        :param trust_value: Trust value.
+        :type trust_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :param exec_time: The time duration in seconds the trust value required to get calculated.
+        :type exec_time: float
+        :rtype: str
+        """
+        return f"{date_time}, '{agent}' trusts '{other_agent}'" \
+               f"{f' in resource <{resource_id}>' if resource_id else ''}" \
+               f"{f' taking {exec_time}s' if exec_time else ''}: {trust_value}"
+
+    @staticmethod
+    def agent_trust_log_line(date_time, metric_str, other_agent, trust_value, resource_id=None):
+        """
+        Formats one line of an agent's trust log.
+
+        :param date_time: Formatted time of the log entry.
+        :type date_time: str
+        :param metric_str: Name of metric trust value is related to.
+        :type metric_str: str
+        :param other_agent: Agent the trust value is about.
+        :type other_agent: str
+        :param trust_value: Trust value.
+        :type trust_value: float or int
+        :param resource_id: The ID of a resource to (dis)trust in.
+        :type resource_id: str
+        :rtype: str
+        """
+        return f"{date_time}, '{metric_str}' trust value for '{other_agent}'" \
+               f"{f' in resource <{resource_id}>' if resource_id else ''}: {trust_value}"
+
+    @staticmethod
+    def render_trust_log(record):
+        """
+        :param record: Entry of the trust log.
+        :type record: dict
+        :return: The human-readable log string of `record`.
+        :rtype: str
+        """
+        return BasicLogger.trust_log_line(BasicLogger.format_time(record['date_time']), record['agent'],
+                                          record['other_agent'], record['trust_value'], record['resource_id'],
+                                          record['exec_time'])
+
+    @staticmethod
+    def render_agent_trust_log(record):
+        """
+        :param record: Entry of an agent's trust log.
+        :type record: dict
+        :return: The human-readable log string of `record`.
+        :rtype: str
+        """
+        return BasicLogger.agent_trust_log_line(BasicLogger.format_time(record['date_time']), record['metric_str'],
+                                                record['other_agent'], record['trust_value'], record['resource_id'])
+
     @staticmethod
     def get_current_time():
+        """
+        :return: The current time as epoch timestamp, which is the time format stored in the log entries.
+        :rtype: float
+        """
+        return time.time()
+
+    @staticmethod
+    def format_time(date_time):
+        """
+        :param date_time: Epoch timestamp of a log entry.
+        :type date_time: float
+        :return: The human-readable time of a log entry.
+        :rtype: str
+        """
         # %f is current microsecond
-        return datetime.now().strftime(BasicLogger.get_time_format_string())
+        return datetime.fromtimestamp(date_time).strftime(BasicLogger.get_time_format_string())
 
     @staticmethod
     def get_time_format_string():
         return '%Y-%m-%d %H:%M:%S:%f'
 
-    def __init__(self, scenario_run_id, semaphore):
+    def __getstate__(self):
+        # locks cannot be pickled when the logger is handed over to the scenario run's process
+        state = self.__dict__.copy()
+        state['locks'] = {}
+        del state['locks_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.locks_lock = Lock()
+
+    def __init__(self, scenario_run_id):
         self.scenario_run_id = scenario_run_id
-        self.semaphore = semaphore
+        self.locks = {}
+        self.locks_lock = Lock()
+        self.history_versions = {}
@@ -1,17 +1,25 @@
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock, Timer
+import json
+import mmap
 import os
-import re
+import time
 from loggers.basic_logger import BasicLogger
-from config import LOG_PATH
+from config import LOG_PATH, LOG_BUFFER_POLICY, LOG_BUFFER_MAX_LINES, LOG_BUFFER_MAX_SECONDS, LOG_MAX_OPEN_FILES
 
 
 class FileLogger(BasicLogger):
     """
     Provides the class to log data lines from and to text files by inheriting from `BasicLogger`.
+    Each line is one log entry as JSON object, such that lines are read in without any pattern matching.
     """
     if not LOG_PATH.exists():
         os.mkdir(LOG_PATH)
 
+    # number of bytes read at once while reading a file backwards from its end
+    tail_block_size = 8192
+
     @staticmethod
     def apply_len_filter(lines, len_filter):
         len_filter = 0 - len_filter if len_filter > 0 else len_filter
@@ -20,58 +28,54 @@ class FileLogger(BasicLogger):
 
     def read_lines_from_agent_history(self, agent, len_filter=None):
         log_path = self.log_path / f"{agent}_history.log"
-        rex = r"(?P<date_time>.*), history trust on '(?P<other_agent>.*)': (?P<trust_value>.*)"
-        rex_resource = r"(?P<date_time>.*), history trust on '(?P<other_agent>.*)' " \
-                       r"in resource <(?P<resource_id>.*)>: (?P<trust_value>.*)"
-        groups = ['date_time', 'other_agent', 'trust_value']
-        groups_resource = ['date_time', 'other_agent', 'resource_id', 'trust_value']
-        return self.read_in_dicts(log_path, rex, rex_resource, groups, groups_resource, len_filter)
+        return self.read_records(log_path, len_filter)
 
     def read_lines_from_agent_topic_trust(self, agent, len_filter=None):
         log_path = self.log_path / f"{agent}_topic.log"
-        rex = r"(?P<date_time>.*), topic trust on '(?P<other_agent>.*)' regarding '(?P<topic>.*)': (?P<trust_value>.*)"
-        rex_resource = r"(?P<date_time>.*), topic trust on '(?P<other_agent>.*)' in resource <(?P<resource_id>.*)> " \
-                       r"regarding '(?P<topic>.*)': (?P<trust_value>.*)"
-        groups = ['date_time', 'other_agent', 'topic', 'trust_value']
-        groups_resource = ['date_time', 'other_agent', 'resource_id', 'topic', 'trust_value']
-        return self.read_in_dicts(log_path, rex, rex_resource, groups, groups_resource, len_filter)
+        return self.read_records(log_path, len_filter)
 
     def read_lines_from_agent_trust_log(self, agent, len_filter=None):
         log_path = self.log_path / f"{agent}_trust_log.log"
-        rex = r"(?P<date_time>.*), '(?P<metric_str>.*)' trust value for '(?P<other_agent>.*)': (?P<trust_value>.*)"
-        rex_resource = r"(?P<date_time>.*), '(?P<metric_str>.*)' trust value for '(?P<other_agent>.*)' " \
-                       r"in resource <(?P<resource_id>.*)>: (?P<trust_value>.*)"
-        groups = ['date_time', 'metric_str', 'other_agent', 'trust_value']
-        groups_resource = ['date_time', 'metric_str', 'other_agent', 'resource_id', 'trust_value']
-        return self.read_in_dicts(log_path, rex, rex_resource, groups, groups_resource, len_filter)
+        return self.read_records(log_path, len_filter)
 
     def read_lines_from_agent_trust_log_str(self, agent, len_filter=None):
-        log_path = self.log_path / f"{agent}_trust_log.log"
-        return self.read_lines(log_path, len_filter)
+        return [f"{self.render_agent_trust_log(record)}\n"
+                for record in self.read_lines_from_agent_trust_log(agent, len_filter)]
 
     def read_lines_from_trust_log(self, len_filter=None):
         log_path = self.log_path / f"trust_log.log"
-        rex = r"(?P<date_time>.*), '(?P<agent>.*)' trusts '(?P<other_agent>.*)': (?P<trust_value>.*)"
-        rex_resource = r"(?P<date_time>.*), '(?P<agent>.*)' trusts '(?P<other_agent>.*)' " \
-                       r"in resource <(?P<resource_id>.*)>: (?P<trust_value>.*)"
-        rex_time = r"(?P<date_time>.*), '(?P<agent>.*)' trusts '(?P<other_agent>.*)' taking (?P<exec_time>.*)s: " \
-                   r"(?P<trust_value>.*)"
-        rex_time_resource = r"(?P<date_time>.*), '(?P<agent>.*)' trusts '(?P<other_agent>.*)' " \
-                            r"in resource <(?P<resource_id>.*)> taking (?P<exec_time>.*)s: (?P<trust_value>.*)"
-        groups = ['date_time', 'agent', 'other_agent', 'trust_value']
-        groups_resource = ['date_time', 'agent', 'other_agent', 'resource_id', 'trust_value']
-        groups_time = ['date_time', 'agent', 'other_agent', 'exec_time', 'trust_value']
-        groups_time_resource = ['date_time', 'agent', 'other_agent', 'resource_id', 'exec_time', 'trust_value']
-        return self.read_in_dicts(log_path, rex, rex_resource, groups, groups_resource, len_filter, rex_time,
-                                  rex_time_resource, groups_time, groups_time_resource)
+        return self.read_records(log_path, len_filter)
 
     def read_lines_from_trust_log_str(self, len_filter=None):
+        return [f"{self.render_trust_log(record)}\n" for record in self.read_lines_from_trust_log(len_filter)]
+
+    def read_lines_from_agent_trust_log_since(self, agent, cursor=None):
+        log_path = self.log_path / f"{agent}_trust_log.log"
+        return self.read_records_since(log_path, cursor)
+
+    def read_lines_from_trust_log_since(self, cursor=None):
+        log_path = self.log_path / f"trust_log.log"
+        return self.read_records_since(log_path, cursor)
+
+    def read_logged_agents(self):
+        agents = set()
+        for suffix in ("_history.log", "_topic.log", "_trust_log.log"):
+            agents.update(log_path.name[:-len(suffix)] for log_path in self.log_path.glob(f"*{suffix}")
+                          if log_path.name != "trust_log.log")
+        return sorted(agents)
+
+    def iter_lines_from_agent_trust_log(self, agent, match=None):
+        log_path = self.log_path / f"{agent}_trust_log.log"
+        return self.iter_records(log_path, match)
+
+    def iter_lines_from_trust_log(self, match=None):
         log_path = self.log_path / f"trust_log.log"
-        return self.read_lines(log_path, len_filter)
+        return self.iter_records(log_path, match)
 
     def read_lines(self, log_path, len_filter, strip=False):
         """
         Reads file in list of strings with only recent number of elements if len_filter is set.
+        With len_filter set, the file is read backwards from its end such that only the returned lines are read.
 
         :param log_path: File to be read.
         :type log_path: Path
@@ -81,146 +85,330 @@ class FileLogger(BasicLogger):
         :type strip: bool
         :rtype: list
         """
-        with self.semaphore:
+        with self.key_lock(log_path):
+            self.flush_buffer(log_path)
             try:
+                if len_filter and type(len_filter) is int:
+                    log_lines = self.read_tail(log_path, abs(len_filter))
+                    return [line.strip() if strip else f"{line}\n" for line in log_lines]
                 with open(log_path.absolute(), "r") as log_file:
                     # strip deletes new line feeds, and filter deletes empty lines from list
-                    log_lines = list(filter(None, [line.strip() if strip else line for line in log_file.readlines()]))
-                if len_filter and type(len_filter) is int:
-                    log_lines = self.apply_len_filter(log_lines, len_filter)
-                return log_lines
+                    return list(filter(None, [line.strip() if strip else line for line in log_file.readlines()]))
             except FileNotFoundError:
                 return []
 
-    def read_in_dicts(self, log_path, rex, rex_resource, groups, groups_resource, len_filter, rex_time=None,
-                      rex_time_resource=None, groups_time=None, groups_time_resource=None):
+    def read_tail(self, log_path, count):
+        """
+        Reads the last `count` non-empty lines of a file by reading blocks backwards from its end.
+
+        :param log_path: File to be read.
+        :type log_path: Path
+        :param count: Number of lines to return.
+        :type count: int
+        :return: The lines without line feeds in order of the file.
+        :rtype: list
+        :raises FileNotFoundError: The file does not exist.
+        """
+        lines = []
+        with open(log_path.absolute(), "rb") as log_file:
+            position = log_file.seek(0, os.SEEK_END)
+            remainder = b''
+            while position > 0 and len(lines) < count:
+                block_size = min(self.tail_block_size, position)
+                position -= block_size
+                log_file.seek(position)
+                block_lines = (log_file.read(block_size) + remainder).split(b'\n')
+                # the first line of the block might be incomplete unless the start of the file is reached
+                remainder = block_lines.pop(0) if position > 0 else b''
+                lines = [line for line in block_lines if line.strip()] + lines
+        return [line.decode('utf-8') for line in lines[-count:]]
+
+    def read_records(self, log_path, len_filter):
         """
-        Reads file in list of dicts, where each dict represents info of one line in file.
+        Reads file of JSON lines in list of dicts, where each dict represents the typed entry of one line in file.
 
         :param log_path: File to be read.
         :type log_path: Path
-        :param rex: Regex to match per line if resource ID was not logged.
-        :type rex: str
-        :param rex_resource: Regex to match per line if resource ID was logged.
-        :type rex_resource: str
-        :param groups: Groups in defined in param rex.
-        :type groups: list
-        :param groups_resource: Groups in defined in param rex_resource.
-        :type groups_resource: list
         :param len_filter: Number of lines to return.
         :type len_filter: int
-        :param rex_time: Regex to match per line if time was logged but not resource ID.
-        :type rex_time: str
-        :param rex_time_resource: Regex to match per line if time and resource ID was logged.
-        :type rex_time_resource: str
-        :param groups_time: Groups in defined in param rex_time.
-        :type groups_time: list
-        :param groups_time_resource: Groups in defined in param rex_time_resource.
-        :type groups_time_resource: list
         :rtype: list
         """
-        log_lines = self.read_lines(log_path, len_filter, strip=True)
-        lines = []
-        for line in log_lines:
-            match = re.search(rex, line)
-            match_resource = re.search(rex_resource, line)
-            match_time = re.search(rex_time, line) if rex_time else None
-            match_time_resource = re.search(rex_time_resource, line) if rex_time_resource else None
-            if match and not match_resource and not match_time and not match_time_resource:
-                line_dict = {key: '' for key in groups}
-                for key in groups:
-                    line_dict[key] = match.group(key)
-            elif not match and match_resource and not match_time and not match_time_resource:
-                line_dict = {key: '' for key in groups_resource}
-                for key in groups_resource:
-                    line_dict[key] = match_resource.group(key)
-            elif match_time and not match and not match_resource and not match_time_resource:
-                line_dict = {key: '' for key in groups_time}
-                for key in groups_time:
-                    line_dict[key] = match_time.group(key)
-            elif match_time_resource and not match and not match_resource and not match_time:
-                line_dict = {key: '' for key in groups_time_resource}
-                for key in groups_time_resource:
-                    line_dict[key] = match_time_resource.group(key)
-            else:
-                raise ValueError(f"'{log_path}' included unmatchable line: {line}")
-            lines.append(line_dict)
-        return lines
+        return [json.loads(line) for line in self.read_lines(log_path, len_filter, strip=True)]
+
+    def iter_records(self, log_path, match=None):
+        """
+        Iterates the JSON lines of a file memory-mapped, such that lines are scanned without copying and only lines
+        matching are decoded. Lines are pre-selected by the JSON encoding of each value of `match` within the raw line
+        of type str and then checked on the decoded entry. Only the lines written until the start of the iteration
+        are read.
+
+        :param log_path: File to be read.
+        :type log_path: Path
+        :param match: Values the yielded lines have to hold at their keys, or None to yield all lines.
+        :type match: dict
+        :return: The typed entries of the matching lines in order of the file.
+        :rtype: Iterator[dict]
+        """
+        match = match if match else {}
+        patterns = [json.dumps({key: value}, separators=(',', ':'))[1:-1].encode('utf-8')
+                    for key, value in match.items() if type(value) is str]
+        with self.key_lock(log_path):
+            self.flush_buffer(log_path)
+            try:
+                log_file = open(log_path.absolute(), "rb")
+            except FileNotFoundError:
+                return
+        with log_file:
+            size = os.fstat(log_file.fileno()).st_size
+            if size == 0:
+                return
+            # the file is only appended, thus the mapped lines do not change while iterating
+            with mmap.mmap(log_file.fileno(), size, access=mmap.ACCESS_READ) as log_map:
+                start = 0
+                while start < size:
+                    end = log_map.find(b'\n', start)
+                    end = size if end == -1 else end
+                    if end > start and all(log_map.find(pattern, start, end) != -1 for pattern in patterns):
+                        entry = json.loads(log_map[start:end])
+                        if all(entry.get(key) == value for key, value in match.items()):
+                            yield entry
+                    start = end + 1
+
+    def read_records_since(self, log_path, cursor):
+        """
+        Reads the JSON lines appended to a file after `cursor` in list of dicts, where the cursor is the file offset
+        in bytes after the last line read.
+
+        :param log_path: File to be read.
+        :type log_path: Path
+        :param cursor: File offset returned by the previous call, or None to read from the start of the file.
+        :type cursor: int
+        :return: The newly read entries and the file offset after them.
+        :rtype: tuple
+        """
+        cursor = cursor if cursor else 0
+        with self.key_lock(log_path):
+            self.flush_buffer(log_path)
+            try:
+                with open(log_path.absolute(), "rb") as log_file:
+                    log_file.seek(cursor)
+                    data = log_file.read()
+            except FileNotFoundError:
+                return [], cursor
+        # only complete lines are read, an incomplete last line is read with the next call
+        end = data.rfind(b'\n') + 1
+        return [json.loads(line) for line in data[:end].split(b'\n') if line.strip()], cursor + end
+
+    def write_lines(self, log_path, make_lines):
+        """
+        Appends all lines created by `make_lines` to the file at `log_path`.
+
+        :param log_path: File to be written.
+        :type log_path: Path
+        :param make_lines: Function without parameters returning the log strings to append, one per line. It is called
+        while holding the lock of `log_path`, such that lines timestamped by it are appended in time order.
+        :type make_lines: Callable
+        :rtype: None
+        """
+        with self.key_lock(log_path):
+            lines = make_lines()
+            if self.buffer_policy is None:
+                with open(log_path.absolute(), "a+") as log_file:
+                    for line in lines:
+                        print(line, file=log_file)
+                return
+            with self.buffer_lock:
+                if not self.buffered_lines:
+                    self.buffer_start = time.time()
+                    if self.buffer_policy == 'threshold':
+                        self.start_flush_timer()
+                self.buffers.setdefault(log_path, []).extend(lines)
+                self.buffered_lines += len(lines)
+                threshold_reached = self.buffered_lines >= LOG_BUFFER_MAX_LINES or \
+                    time.time() - self.buffer_start >= LOG_BUFFER_MAX_SECONDS
+            if self.buffer_policy == 'flush':
+                self.flush_buffer(log_path)
+        # flushing all files is done without holding the lock of this file to not wait crosswise with other writers
+        if self.buffer_policy == 'threshold' and threshold_reached:
+            self.flush_buffers()
+
+    def start_flush_timer(self):
+        """
+        Starts a timer flushing all buffered lines after LOG_BUFFER_MAX_SECONDS, such that buffered lines are written
+        in time even if no further line is written. A timer still running from former buffered lines is kept, as it
+        flushes the new lines earlier. Requires the buffer lock to be acquired.
+
+        :rtype: None
+        """
+        if self.flush_timer is not None:
+            return
+        self.flush_timer = Timer(LOG_BUFFER_MAX_SECONDS, self.flush_by_timer)
+        self.flush_timer.daemon = True
+        self.flush_timer.start()
+
+    def flush_by_timer(self):
+        """
+        Flushes all buffered lines once the timer expired and starts a new timer if lines were buffered meanwhile,
+        e.g. for files already flushed, such that no line stays buffered longer than until the next timer.
+
+        :rtype: None
+        """
+        with self.buffer_lock:
+            # writers buffering lines from now on start a new timer
+            self.flush_timer = None
+        self.flush_buffers()
+        with self.buffer_lock:
+            if self.buffered_lines:
+                self.start_flush_timer()
+
+    def log_file(self, log_path):
+        """
+        Returns the kept open file at `log_path` for appending, while closing the least recently used file if more than
+        LOG_MAX_OPEN_FILES would be open. Files currently used by other threads are not closed.
+        Requires the lock of `log_path` to be acquired.
+
+        :param log_path: File to be written.
+        :type log_path: Path
+        :rtype: TextIO
+        """
+        with self.buffer_lock:
+            if log_path in self.log_files:
+                self.log_files.move_to_end(log_path)
+                return self.log_files[log_path]
+            for open_path in list(self.log_files.keys()):
+                if len(self.log_files) < LOG_MAX_OPEN_FILES:
+                    break
+                open_path_lock = self.key_lock(open_path)
+                if open_path_lock.acquire(blocking=False):
+                    try:
+                        self.log_files.pop(open_path).close()
+                    finally:
+                        open_path_lock.release()
+            self.log_files[log_path] = open(log_path.absolute(), "a+")
+            return self.log_files[log_path]
+
+    def flush_buffer(self, log_path):
+        """
+        Writes out the buffered lines of the file at `log_path`. Requires the lock of `log_path` to be acquired.
+
+        :param log_path: File to be written.
+        :type log_path: Path
+        :rtype: None
+        """
+        with self.buffer_lock:
+            lines = self.buffers.pop(log_path, None)
+            if lines:
+                self.buffered_lines -= len(lines)
+        if lines:
+            log_file = self.log_file(log_path)
+            log_file.write("\n".join(lines) + "\n")
+            log_file.flush()
+
+    def flush_buffers(self):
+        """
+        Writes out the buffered lines of all files, while acquiring the lock of one file after another.
+
+        :rtype: None
+        """
+        with self.buffer_lock:
+            log_paths = list(self.buffers.keys())
+        for log_path in log_paths:
+            with self.key_lock(log_path):
+                self.flush_buffer(log_path)
+
+    def close(self):
+        with self.buffer_lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+        self.flush_buffers()
+        with self.buffer_lock:
+            log_paths = list(self.log_files.keys())
+        for log_path in log_paths:
+            with self.key_lock(log_path), self.buffer_lock:
+                if log_path in self.log_files:
+                    self.log_files.pop(log_path).close()
+
+    def write_records(self, log_path, make_records):
+        """
+        Appends all records created by `make_records` to the file at `log_path` as one JSON line each, where the
+        records are created while holding the lock of `log_path` to keep the file in order of their timestamps.
+
+        :param log_path: File to be written.
+        :type log_path: Path
+        :param make_records: Function without parameters returning the log entries to append.
+        :type make_records: Callable
+        :return: The records written.
+        :rtype: list
+        """
+        records = []
+
+        def make_lines():
+            records.extend(make_records())
+            return [json.dumps(record, separators=(',', ':')) for record in records]
+        self.write_lines(log_path, make_lines)
+        return records
 
     def write_to_agent_history(self, agent, other_agent, history_value, resource_id=None):
         log_path = self.log_path / f"{agent}_history.log"
-        write_string = f"{BasicLogger.get_current_time()}, history trust on '{other_agent}'" \
-                       f"{f' in resource <{resource_id}>' if resource_id else ''}: {history_value}"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as history_file:
-                print(write_string, file=history_file)
+        records = self.write_records(log_path, lambda: [self.history_record(other_agent, history_value, resource_id)])
+        self.count_history_writes(agent, records)
 
     def write_bulk_to_agent_history(self, agent, history, resource_id=None):
         log_path = self.log_path / f"{agent}_history.log"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as history_file:
-                if type(history) == list:
-                    for entry in history:
-                        other_agent, resource_id, history_value = entry[0], entry[1], entry[2]
-                        write_string = f"{BasicLogger.get_current_time()}, history trust on '{other_agent}'" \
-                                       f"{f' in resource <{resource_id}>' if resource_id else ''}: {history_value}"
-                        print(write_string, file=history_file)
-                elif type(history) == dict:
-                    for other_agent, history_value in history.items():
-                        write_string = f"{BasicLogger.get_current_time()}, history trust on '{other_agent}'" \
-                                       f"{f' in resource <{resource_id}>' if resource_id else ''}: {history_value}"
-                        print(write_string, file=history_file)
-                else:
-                    raise TypeError("Unexpected type for History object")
+        records = self.write_records(log_path, lambda: [
+            self.history_record(other_agent, history_value, item_resource)
+            for other_agent, item_resource, history_value in self.history_items(history, resource_id)])
+        self.count_history_writes(agent, records)
 
     def write_to_agent_topic_trust(self, agent, other_agent, topic, topic_value, resource_id=None):
         log_path = self.log_path / f"{agent}_topic.log"
-        write_string = f"{BasicLogger.get_current_time()}, topic trust on '{other_agent}'" \
-                       f"{f' in resource <{resource_id}>' if resource_id else ''} regarding '{topic}': {topic_value}"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as topic_file:
-                print(write_string, file=topic_file)
+        self.write_records(log_path, lambda: [self.topic_record(other_agent, topic, topic_value, resource_id)])
 
     def write_bulk_to_agent_topic_trust(self, agent, topic_trust, resource_id=None):
         log_path = self.log_path / f"{agent}_topic.log"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as topic_file:
-                for other_agent, topic_dict in topic_trust.items():
-                    if topic_dict:
-                        for topic, topic_value in topic_dict.items():
-                            write_string = f"{BasicLogger.get_current_time()}, topic trust on '{other_agent}'" \
-                                           f"{f' in resource <{resource_id}>' if resource_id else ''}" \
-                                           f" regarding '{topic}': {topic_value}"
-                            print(write_string, file=topic_file)
+        self.write_records(log_path, lambda: [
+            self.topic_record(other_agent, topic, topic_value, resource_id)
+            for other_agent, topic, topic_value in self.topic_trust_items(topic_trust)])
 
     def write_to_agent_message_log(self, observation):
         log_path = self.log_path / f"{observation.receiver}.log"
-        write_string = f"{BasicLogger.get_current_time()}, '{observation.receiver}' received from " \
-                       f"'{observation.sender}' with observation id '{observation.observation_id}' " \
-                       f"the message: {observation.message}"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as agent_log:
-                print(write_string, file=agent_log)
+        self.write_records(log_path, lambda: [self.message_record(observation)])
 
     def write_to_trust_log(self, agent, other_agent, trust_value, resource_id=None, exec_time=None):
         log_path = self.log_path / "trust_log.log"
-        write_string = f"{BasicLogger.get_current_time()}, '{agent}' trusts '{other_agent}'" \
-                       f"{f' in resource <{resource_id}>' if resource_id else ''}" \
-                       f"{f' taking {exec_time}s' if exec_time else ''}: {trust_value}"
-        with self.semaphore:
-            with open(log_path.absolute(), 'a+') as trust_log:
-                print(write_string, file=trust_log)
+        self.write_records(log_path, lambda: [
+            self.trust_log_record(agent, other_agent, trust_value, resource_id, exec_time)])
 
     def write_to_agent_trust_log(self, agent, metric_str, other_agent, trust_value, resource_id=None):
         log_path = self.log_path / f"{agent}_trust_log.log"
-        write_string = f"{BasicLogger.get_current_time()}, '{metric_str}' trust value for '{other_agent}'" \
-                       f"{f' in resource <{resource_id}>' if resource_id else ''}: {trust_value}"
-        with self.semaphore:
-            with open(log_path.absolute(), "a+") as trust_log:
-                print(write_string,  file=trust_log)
-
-    def __init__(self, scenario_run_id, semaphore):
-        super().__init__(scenario_run_id, semaphore)
+        self.write_records(log_path, lambda: [
+            self.agent_trust_log_record(metric_str, other_agent, trust_value, resource_id)])
+
+    def __getstate__(self):
+        # open files and locks cannot be pickled when the logger is handed over to the scenario run's process
+        state = super().__getstate__()
+        state['log_files'] = OrderedDict()
+        state['flush_timer'] = None
+        del state['buffer_lock']
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.buffer_lock = Lock()
+
+    def __init__(self, scenario_run_id):
+        super().__init__(scenario_run_id)
+        self.buffer_policy = LOG_BUFFER_POLICY
+        # guards the buffers and open files shared by all files' writers
+        self.buffer_lock = Lock()
+        # lines per file not yet written and open files ordered by their last use
+        self.buffers = {}
+        self.buffered_lines = 0
+        self.buffer_start = None
+        # flushes the buffered lines of the 'threshold' policy once they reach their maximum age
+        self.flush_timer = None
+        self.log_files = OrderedDict()
         split_index = len(scenario_run_id.split("_")[0]) + 1  # index to cut constant of runId -> 'scenarioRun_'
         self.folder_name = scenario_run_id[split_index:]
         self.log_path = Path(f"{LOG_PATH}/{self.folder_name}/")
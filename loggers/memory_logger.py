@@ -0,0 +1,310 @@
+from collections import deque
+from loggers.file_logger import FileLogger
+
+
+class LogIndex:
+    """
+    Keeps the data lines of one agent's log in memory in order of writing, while indexing them by given keys.
+    """
+    def append(self, entry):
+        """
+        Appends `entry` to the lines and all indices.
+
+        :param entry: Information of one data line.
+        :type entry: dict
+        :rtype: None
+        """
+        self.entries.append(entry)
+        for key, index in self.indices.items():
+            index.setdefault(entry.get(key), []).append(entry)
+
+    def recent(self, len_filter=None):
+        """
+        :param len_filter: Number of lines to return.
+        :type len_filter: int
+        :return: All lines or only the recent number of lines if len_filter is set in order of writing.
+        :rtype: list
+        """
+        if len_filter and type(len_filter) is int:
+            return self.entries[-abs(len_filter):]
+        return list(self.entries)
+
+    def lookup(self, key, value):
+        """
+        :param key: Key of the index to use.
+        :type key: str
+        :param value: Value the lines have to hold at `key`.
+        :type value: str
+        :return: All lines holding `value` at `key` in order of writing, which must not be modified.
+        :rtype: list
+        """
+        return self.indices[key].get(value, [])
+
+    def __init__(self, keys):
+        self.entries = []
+        self.indices = {key: {} for key in keys}
+
+
+class WindowMean:
+    """
+    Keeps the running sum and count of set trust values in time order, while evicting the values that fall out of
+    the recency window. Thus, the mean within the window is returned without iterating the values.
+    """
+    def append(self, entry):
+        """
+        Adds the trust value of `entry` if set, where entries are expected in time order.
+
+        :param entry: Information of one data line.
+        :type entry: dict
+        :rtype: None
+        """
+        if entry['trust_value'] is not None:
+            self.values.append((entry['date_time'], entry['trust_value']))
+            self.total += entry['trust_value']
+
+    def evict(self, recency_timestamp):
+        """
+        Removes all values not newer than `recency_timestamp`.
+
+        :param recency_timestamp: Epoch timestamp values have to be newer than.
+        :type recency_timestamp: float
+        :rtype: None
+        """
+        while self.values and self.values[0][0] <= recency_timestamp:
+            self.total -= self.values.popleft()[1]
+        if not self.values:
+            # reset accumulated rounding errors of the running sum
+            self.total = 0
+        self.evicted_until = max(self.evicted_until, recency_timestamp)
+
+    def mean(self):
+        return self.total / len(self.values) if len(self.values) > 0 else None
+
+    def __init__(self):
+        self.values = deque()
+        self.total = 0
+        # epoch timestamp up to which values were evicted, such that older windows cannot be answered anymore
+        self.evicted_until = float('-inf')
+
+
+class WindowMax:
+    """
+    Keeps the set trust values in time order that may still become the maximum of the recency window, as each value
+    followed by a greater or equal one is dropped. Thus, the maximum within the window is the first value kept.
+    """
+    def append(self, entry):
+        """
+        Adds the trust value of `entry` if set, where entries are expected in time order.
+
+        :param entry: Information of one data line.
+        :type entry: dict
+        :rtype: None
+        """
+        if entry['trust_value'] is not None:
+            while self.values and self.values[-1][1] <= entry['trust_value']:
+                self.values.pop()
+            self.values.append((entry['date_time'], entry['trust_value']))
+
+    def evict(self, recency_timestamp):
+        """
+        Removes all values not newer than `recency_timestamp`.
+
+        :param recency_timestamp: Epoch timestamp values have to be newer than.
+        :type recency_timestamp: float
+        :rtype: None
+        """
+        while self.values and self.values[0][0] <= recency_timestamp:
+            self.values.popleft()
+        self.evicted_until = max(self.evicted_until, recency_timestamp)
+
+    def maximum(self):
+        return self.values[0][1] if len(self.values) > 0 else None
+
+    def __init__(self):
+        self.values = deque()
+        # epoch timestamp up to which values were evicted, such that older windows cannot be answered anymore
+        self.evicted_until = float('-inf')
+
+
+class MemoryLogger(FileLogger):
+    """
+    Provides the class to log data lines to text files like `FileLogger`, while keeping the agents' history and
+    topic trust in memory indexed by resource ID, other agent and topic. Thus, reads of history and topic trust
+    are served as index lookups instead of re-reading and parsing the log files.
+    The means of the history per resource ID and other agent are kept as running aggregates over the recency window.
+    The topic trust is further aggregated at each write into running sums per other agent and topic as well as
+    running maxima per topic and other agent, which answer the topic and user expertise metrics.
+    """
+    indexed_reads = True
+
+    def history_index(self, agent):
+        if agent not in self.histories:
+            self.histories[agent] = LogIndex(['resource_id', 'other_agent'])
+        return self.histories[agent]
+
+    def topic_trust_index(self, agent):
+        if agent not in self.topic_trusts:
+            self.topic_trusts[agent] = LogIndex(['other_agent', 'topic'])
+        return self.topic_trusts[agent]
+
+    def history_mean(self, agent, key, value):
+        if agent not in self.history_means:
+            self.history_means[agent] = {}
+        if (key, value) not in self.history_means[agent]:
+            window_mean = WindowMean()
+            for entry in self.history_index(agent).lookup(key, value):
+                window_mean.append(entry)
+            self.history_means[agent][(key, value)] = window_mean
+        return self.history_means[agent][(key, value)]
+
+    def read_window_mean(self, agent, key, value, recency_limit):
+        """
+        Returns the mean of the `agent`'s history values holding `value` at `key` within `recency_limit` in O(1)
+        amortized time, as values leaving the window are evicted once. Only if an older window is requested than
+        already evicted, the mean is calculated from the history index.
+
+        :param agent: Agent which log is read.
+        :type agent: str
+        :param key: Key of the history index to use.
+        :type key: str
+        :param value: Value the lines have to hold at `key`.
+        :type value: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :return: The mean of all set history values, or None if there are none.
+        :rtype: float or None
+        """
+        recency_timestamp = recency_limit.timestamp() if recency_limit is not None else float('-inf')
+        with self.key_lock(agent):
+            window_mean = self.history_mean(agent, key, value)
+            if recency_timestamp < window_mean.evicted_until:
+                lines = self.filter_recency(self.history_index(agent).lookup(key, value), recency_limit)
+                return self.mean_trust_value(lines)
+            window_mean.evict(recency_timestamp)
+            return window_mean.mean()
+
+    def read_topic_trust_sums_by_other_agent(self, agent, other_agent, topics, recency_limit=None):
+        recency_timestamp = recency_limit.timestamp() if recency_limit is not None else float('-inf')
+        sums = {}
+        with self.key_lock(agent):
+            topic_sums = self.topic_sums.get(agent, {})
+            for topic in topics:
+                if (other_agent, topic) not in topic_sums:
+                    continue
+                window_sum = topic_sums[(other_agent, topic)]
+                if recency_timestamp < window_sum.evicted_until:
+                    lines = self.filter_recency(self.topic_trust_index(agent).lookup('other_agent', other_agent),
+                                                recency_limit)
+                    sums.update(self.topic_trust_sums(lines, [topic]))
+                    continue
+                window_sum.evict(recency_timestamp)
+                if len(window_sum.values) > 0:
+                    sums[topic] = (window_sum.total, len(window_sum.values))
+        return sums
+
+    def read_topic_experts(self, agent, topics, minimum, recency_limit=None):
+        recency_timestamp = recency_limit.timestamp() if recency_limit is not None else float('-inf')
+        experts = {}
+        with self.key_lock(agent):
+            topic_maxima = self.topic_maxima.get(agent, {})
+            for topic in topics:
+                for other_agent, window_max in topic_maxima.get(topic, {}).items():
+                    if recency_timestamp < window_max.evicted_until:
+                        lines = self.filter_recency(self.topic_trust_index(agent).lookup('topic', topic),
+                                                    recency_limit)
+                        experts.update(dict.fromkeys(self.topic_experts(lines, minimum)))
+                        break
+                    window_max.evict(recency_timestamp)
+                    if window_max.maximum() is not None and window_max.maximum() >= minimum:
+                        experts[other_agent] = None
+        return list(experts)
+
+    def read_lines_from_agent_history(self, agent, len_filter=None):
+        with self.key_lock(agent):
+            return self.history_index(agent).recent(len_filter)
+
+    def read_lines_from_agent_topic_trust(self, agent, len_filter=None):
+        with self.key_lock(agent):
+            return self.topic_trust_index(agent).recent(len_filter)
+
+    def read_lines_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        with self.key_lock(agent):
+            return self.filter_recency(self.history_index(agent).lookup('resource_id', resource_id), recency_limit)
+
+    def read_lines_from_agent_history_by_resources(self, agent, resource_ids, recency_limit=None):
+        with self.key_lock(agent):
+            index = self.history_index(agent)
+            return {resource_id: self.filter_recency(index.lookup('resource_id', resource_id), recency_limit)
+                    for resource_id in resource_ids}
+
+    def read_lines_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        with self.key_lock(agent):
+            return self.filter_recency(self.history_index(agent).lookup('other_agent', other_agent), recency_limit)
+
+    def read_lines_from_agent_topic_trust_by_other_agent(self, agent, other_agent, recency_limit=None):
+        with self.key_lock(agent):
+            return self.filter_recency(self.topic_trust_index(agent).lookup('other_agent', other_agent), recency_limit)
+
+    def read_lines_from_agent_topic_trust_by_topic(self, agent, topic, recency_limit=None):
+        with self.key_lock(agent):
+            return self.filter_recency(self.topic_trust_index(agent).lookup('topic', topic), recency_limit)
+
+    def read_mean_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        return self.read_window_mean(agent, 'resource_id', resource_id, recency_limit)
+
+    def read_mean_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        return self.read_window_mean(agent, 'other_agent', other_agent, recency_limit)
+
+    def read_means_from_agent_history_per_other_agent(self, agent, recency_limit=None):
+        with self.key_lock(agent):
+            other_agents = list(self.history_index(agent).indices['other_agent'].keys())
+        means = {other_agent: self.read_window_mean(agent, 'other_agent', other_agent, recency_limit)
+                 for other_agent in other_agents}
+        return {other_agent: mean for other_agent, mean in means.items() if mean is not None}
+
+    def write_to_agent_history(self, agent, other_agent, history_value, resource_id=None):
+        self.write_bulk_to_agent_history(agent, [[other_agent, resource_id, history_value]])
+
+    def write_bulk_to_agent_history(self, agent, history, resource_id=None):
+        log_path = self.log_path / f"{agent}_history.log"
+        with self.key_lock(agent):
+            # records are timestamped under lock to keep each index in time order for recency filtering
+            records = [self.history_record(other_agent, history_value, item_resource)
+                       for other_agent, item_resource, history_value in self.history_items(history, resource_id)]
+            index = self.history_index(agent)
+            means = self.history_means.get(agent, {})
+            for record in records:
+                index.append(record)
+                for key in ('resource_id', 'other_agent'):
+                    if (key, record[key]) in means:
+                        means[(key, record[key])].append(record)
+            self.write_records(log_path, lambda: records)
+        self.count_history_writes(agent, records)
+
+    def write_to_agent_topic_trust(self, agent, other_agent, topic, topic_value, resource_id=None):
+        self.write_bulk_to_agent_topic_trust(agent, {other_agent: {topic: topic_value}}, resource_id)
+
+    def write_bulk_to_agent_topic_trust(self, agent, topic_trust, resource_id=None):
+        log_path = self.log_path / f"{agent}_topic.log"
+        with self.key_lock(agent):
+            records = [self.topic_record(other_agent, topic, topic_value, resource_id)
+                       for other_agent, topic, topic_value in self.topic_trust_items(topic_trust)]
+            index = self.topic_trust_index(agent)
+            topic_sums = self.topic_sums.setdefault(agent, {})
+            topic_maxima = self.topic_maxima.setdefault(agent, {})
+            for record in records:
+                index.append(record)
+                topic_sums.setdefault((record['other_agent'], record['topic']), WindowMean()).append(record)
+                topic_maxima.setdefault(record['topic'], {}).setdefault(record['other_agent'], WindowMax()).append(
+                    record)
+            self.write_records(log_path, lambda: records)
+
+    def __init__(self, scenario_run_id):
+        super().__init__(scenario_run_id)
+        self.histories = {}
+        self.topic_trusts = {}
+        # running means of each agent's history per (key, value) of the history index, created at first read
+        self.history_means = {}
+        # running sums of each agent's topic trust per (other agent, topic) and maxima per topic and other agent
+        self.topic_sums = {}
+        self.topic_maxima = {}
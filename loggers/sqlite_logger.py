@@ -0,0 +1,311 @@
+from pathlib import Path
+from threading import RLock
+import os
+import sqlite3
+from loggers.basic_logger import BasicLogger
+from config import LOG_PATH
+
+
+class SqliteLogger(BasicLogger):
+    """
+    Provides the class to log data lines from and to a local SQLite database by inheriting from `BasicLogger`.
+    History and topic trust are stored in tables indexed by agent, resource ID, other agent, topic and time, such that
+    the filtered queries of the trust metrics are answered by the database instead of scanning all lines.
+    """
+    if not LOG_PATH.exists():
+        os.mkdir(LOG_PATH)
+
+    db_name = "logs.sqlite3"
+
+    indexed_reads = True
+
+    schema = [
+        "CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY, agent TEXT, date_time REAL, other_agent TEXT, "
+        "resource_id TEXT, trust_value)",
+        "CREATE INDEX IF NOT EXISTS history_resource ON history (agent, resource_id, date_time)",
+        "CREATE INDEX IF NOT EXISTS history_other_agent ON history (agent, other_agent, date_time)",
+        "CREATE TABLE IF NOT EXISTS topic_trust (id INTEGER PRIMARY KEY, agent TEXT, date_time REAL, "
+        "other_agent TEXT, resource_id TEXT, topic TEXT, trust_value)",
+        "CREATE INDEX IF NOT EXISTS topic_trust_other_agent ON topic_trust (agent, other_agent, topic)",
+        "CREATE INDEX IF NOT EXISTS topic_trust_topic ON topic_trust (agent, topic, date_time)",
+        "CREATE TABLE IF NOT EXISTS agent_trust_log (id INTEGER PRIMARY KEY, agent TEXT, date_time REAL, "
+        "metric_str TEXT, other_agent TEXT, resource_id TEXT, trust_value)",
+        "CREATE INDEX IF NOT EXISTS agent_trust_log_agent ON agent_trust_log (agent)",
+        "CREATE TABLE IF NOT EXISTS trust_log (id INTEGER PRIMARY KEY, date_time REAL, agent TEXT, "
+        "other_agent TEXT, resource_id TEXT, exec_time REAL, trust_value)",
+        "CREATE TABLE IF NOT EXISTS message_log (id INTEGER PRIMARY KEY, date_time REAL, receiver TEXT, "
+        "sender TEXT, observation_id, message TEXT)",
+    ]
+
+    @staticmethod
+    def apply_len_filter(lines, len_filter):
+        len_filter = 0 - len_filter if len_filter > 0 else len_filter
+        lines = lines[len_filter:]
+        return lines
+
+    @staticmethod
+    def history_dict(row):
+        """
+        :param row: Row of the history table as (date_time, other_agent, resource_id, trust_value).
+        :type row: tuple
+        :return: The row in the same dict format as an entry of a history log file.
+        :rtype: dict
+        """
+        return dict(zip(('date_time', 'other_agent', 'resource_id', 'trust_value'), row))
+
+    @staticmethod
+    def topic_trust_dict(row):
+        """
+        :param row: Row of the topic trust table as (date_time, other_agent, resource_id, topic, trust_value).
+        :type row: tuple
+        :return: The row in the same dict format as an entry of a topic trust log file.
+        :rtype: dict
+        """
+        return dict(zip(('date_time', 'other_agent', 'resource_id', 'topic', 'trust_value'), row))
+
+    def read_lines_from_agent_history(self, agent, len_filter=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, trust_value FROM history WHERE agent = ?",
+                           (agent,), len_filter)
+        return [self.history_dict(row) for row in rows]
+
+    def read_lines_from_agent_topic_trust(self, agent, len_filter=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, topic, trust_value FROM topic_trust "
+                           "WHERE agent = ?", (agent,), len_filter)
+        return [self.topic_trust_dict(row) for row in rows]
+
+    def read_lines_from_agent_trust_log(self, agent, len_filter=None):
+        rows = self.select("SELECT date_time, metric_str, other_agent, resource_id, trust_value FROM agent_trust_log "
+                           "WHERE agent = ?", (agent,), len_filter)
+        return [dict(zip(('date_time', 'metric_str', 'other_agent', 'resource_id', 'trust_value'), row))
+                for row in rows]
+
+    def read_lines_from_agent_trust_log_str(self, agent, len_filter=None):
+        return [f"{self.render_agent_trust_log(record)}\n"
+                for record in self.read_lines_from_agent_trust_log(agent, len_filter)]
+
+    def read_lines_from_trust_log(self, len_filter=None):
+        rows = self.select("SELECT date_time, agent, other_agent, resource_id, exec_time, trust_value FROM trust_log",
+                           (), len_filter)
+        return [dict(zip(('date_time', 'agent', 'other_agent', 'resource_id', 'exec_time', 'trust_value'), row))
+                for row in rows]
+
+    def read_lines_from_trust_log_str(self, len_filter=None):
+        return [f"{self.render_trust_log(record)}\n" for record in self.read_lines_from_trust_log(len_filter)]
+
+    def read_lines_from_agent_trust_log_since(self, agent, cursor=None):
+        rows = self.select("SELECT id, date_time, metric_str, other_agent, resource_id, trust_value "
+                           "FROM agent_trust_log WHERE agent = ? AND id > ?", (agent, cursor if cursor else 0))
+        records = [dict(zip(('date_time', 'metric_str', 'other_agent', 'resource_id', 'trust_value'), row[1:]))
+                   for row in rows]
+        return records, rows[-1][0] if rows else cursor
+
+    def read_lines_from_trust_log_since(self, cursor=None):
+        rows = self.select("SELECT id, date_time, agent, other_agent, resource_id, exec_time, trust_value "
+                           "FROM trust_log WHERE id > ?", (cursor if cursor else 0,))
+        records = [dict(zip(('date_time', 'agent', 'other_agent', 'resource_id', 'exec_time', 'trust_value'), row[1:]))
+                   for row in rows]
+        return records, rows[-1][0] if rows else cursor
+
+    def read_logged_agents(self):
+        with self.connection_lock:
+            rows = self.connection().execute("SELECT agent FROM history UNION SELECT agent FROM topic_trust "
+                                             "UNION SELECT agent FROM agent_trust_log ORDER BY agent").fetchall()
+        return [row[0] for row in rows]
+
+    def read_lines_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, trust_value FROM history "
+                           "WHERE agent = ? AND resource_id = ? AND date_time > ?",
+                           (agent, resource_id, self.recency_timestamp(recency_limit)))
+        return [self.history_dict(row) for row in rows]
+
+    def read_lines_from_agent_history_by_resources(self, agent, resource_ids, recency_limit=None):
+        resource_ids = list(dict.fromkeys(resource_ids))
+        rows = self.select("SELECT date_time, other_agent, resource_id, trust_value FROM history "
+                           f"WHERE agent = ? AND resource_id IN ({', '.join('?' * len(resource_ids))}) "
+                           "AND date_time > ?",
+                           (agent, *resource_ids, self.recency_timestamp(recency_limit)))
+        lines = {resource_id: [] for resource_id in resource_ids}
+        for row in rows:
+            lines[row[2]].append(self.history_dict(row))
+        return lines
+
+    def read_lines_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, trust_value FROM history "
+                           "WHERE agent = ? AND other_agent = ? AND date_time > ?",
+                           (agent, other_agent, self.recency_timestamp(recency_limit)))
+        return [self.history_dict(row) for row in rows]
+
+    def read_lines_from_agent_topic_trust_by_other_agent(self, agent, other_agent, recency_limit=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, topic, trust_value FROM topic_trust "
+                           "WHERE agent = ? AND other_agent = ? AND date_time > ?",
+                           (agent, other_agent, self.recency_timestamp(recency_limit)))
+        return [self.topic_trust_dict(row) for row in rows]
+
+    def read_lines_from_agent_topic_trust_by_topic(self, agent, topic, recency_limit=None):
+        rows = self.select("SELECT date_time, other_agent, resource_id, topic, trust_value FROM topic_trust "
+                           "WHERE agent = ? AND topic = ? AND date_time > ?",
+                           (agent, topic, self.recency_timestamp(recency_limit)))
+        return [self.topic_trust_dict(row) for row in rows]
+
+    def read_mean_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        rows = self.select("SELECT AVG(trust_value) FROM history WHERE agent = ? AND resource_id = ? AND date_time > ?",
+                           (agent, resource_id, self.recency_timestamp(recency_limit)))
+        return rows[0][0]
+
+    def read_mean_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        rows = self.select("SELECT AVG(trust_value) FROM history WHERE agent = ? AND other_agent = ? AND date_time > ?",
+                           (agent, other_agent, self.recency_timestamp(recency_limit)))
+        return rows[0][0]
+
+    def read_means_from_agent_history_per_other_agent(self, agent, recency_limit=None):
+        with self.connection_lock:
+            rows = self.connection().execute(
+                "SELECT other_agent, AVG(trust_value) FROM history WHERE agent = ? AND date_time > ? "
+                "AND trust_value IS NOT NULL GROUP BY other_agent",
+                (agent, self.recency_timestamp(recency_limit))).fetchall()
+        return dict(rows)
+
+    def read_topic_trust_sums_by_other_agent(self, agent, other_agent, topics, recency_limit=None):
+        topics = list(dict.fromkeys(topics))
+        if len(topics) == 0:
+            return {}
+        with self.connection_lock:
+            rows = self.connection().execute(
+                "SELECT topic, SUM(trust_value), COUNT(trust_value) FROM topic_trust WHERE agent = ? AND "
+                f"other_agent = ? AND topic IN ({', '.join('?' * len(topics))}) AND date_time > ? "
+                "AND trust_value IS NOT NULL GROUP BY topic",
+                (agent, other_agent, *topics, self.recency_timestamp(recency_limit))).fetchall()
+        return {topic: (total, count) for topic, total, count in rows}
+
+    def read_topic_experts(self, agent, topics, minimum, recency_limit=None):
+        topics = list(dict.fromkeys(topics))
+        if len(topics) == 0:
+            return []
+        rows = self.select("SELECT DISTINCT other_agent FROM topic_trust "
+                           f"WHERE agent = ? AND topic IN ({', '.join('?' * len(topics))}) AND trust_value >= ? "
+                           "AND date_time > ?",
+                           (agent, *topics, minimum, self.recency_timestamp(recency_limit)))
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def recency_timestamp(recency_limit):
+        """
+        :param recency_limit: Point in time lines have to be newer than, or None for no limit.
+        :type recency_limit: datetime
+        :return: The recency limit as epoch timestamp to compare with the stored times.
+        :rtype: float
+        """
+        return recency_limit.timestamp() if recency_limit is not None else float('-inf')
+
+    def connection(self):
+        """
+        Opens the database connection in the current process at first use, as connections cannot be handed over to
+        the scenario run's process.
+
+        :rtype: sqlite3.Connection
+        """
+        if self.db_connection is None:
+            self.db_connection = sqlite3.connect(str(self.log_path / self.db_name), check_same_thread=False)
+            self.db_connection.execute("PRAGMA journal_mode=WAL")
+            self.db_connection.execute("PRAGMA synchronous=NORMAL")
+            with self.db_connection:
+                for statement in self.schema:
+                    self.db_connection.execute(statement)
+        return self.db_connection
+
+    def select(self, query, parameters, len_filter=None):
+        """
+        Executes the select `query` and returns its rows in order of writing with only recent number of rows
+        if len_filter is set.
+
+        :param query: SQL select statement without ordering.
+        :type query: str
+        :param parameters: Parameters of the select statement.
+        :type parameters: tuple
+        :param len_filter: Number of rows to return.
+        :type len_filter: int
+        :rtype: list
+        """
+        with self.connection_lock:
+            if len_filter and type(len_filter) is int:
+                rows = self.connection().execute(f"{query} ORDER BY id DESC LIMIT ?",
+                                                 parameters + (abs(len_filter),)).fetchall()
+                rows.reverse()
+            else:
+                rows = self.connection().execute(f"{query} ORDER BY id", parameters).fetchall()
+        return rows
+
+    def insert(self, statement, rows):
+        """
+        Inserts all `rows` with the insert `statement` in one transaction.
+
+        :param statement: SQL insert statement.
+        :type statement: str
+        :param rows: Parameters of the insert statement per row.
+        :type rows: list
+        :rtype: None
+        """
+        with self.connection_lock:
+            with self.connection() as connection:
+                connection.executemany(statement, rows)
+
+    def write_to_agent_history(self, agent, other_agent, history_value, resource_id=None):
+        self.write_bulk_to_agent_history(agent, [[other_agent, resource_id, history_value]])
+
+    def write_bulk_to_agent_history(self, agent, history, resource_id=None):
+        records = [self.history_record(other_agent, history_value, item_resource)
+                   for other_agent, item_resource, history_value in self.history_items(history, resource_id)]
+        self.insert("INSERT INTO history (agent, date_time, other_agent, resource_id, trust_value) "
+                    "VALUES (?, ?, ?, ?, ?)", [(agent,) + tuple(record.values()) for record in records])
+        self.count_history_writes(agent, records)
+
+    def write_to_agent_topic_trust(self, agent, other_agent, topic, topic_value, resource_id=None):
+        self.write_bulk_to_agent_topic_trust(agent, {other_agent: {topic: topic_value}}, resource_id)
+
+    def write_bulk_to_agent_topic_trust(self, agent, topic_trust, resource_id=None):
+        records = [self.topic_record(other_agent, topic, topic_value, resource_id)
+                   for other_agent, topic, topic_value in self.topic_trust_items(topic_trust)]
+        self.insert("INSERT INTO topic_trust (agent, date_time, other_agent, resource_id, topic, trust_value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", [(agent,) + tuple(record.values()) for record in records])
+
+    def write_to_agent_message_log(self, observation):
+        record = self.message_record(observation)
+        self.insert("INSERT INTO message_log (date_time, receiver, sender, observation_id, message) "
+                    "VALUES (?, ?, ?, ?, ?)", [tuple(record.values())])
+
+    def write_to_trust_log(self, agent, other_agent, trust_value, resource_id=None, exec_time=None):
+        record = self.trust_log_record(agent, other_agent, trust_value, resource_id, exec_time)
+        self.insert("INSERT INTO trust_log (date_time, agent, other_agent, resource_id, exec_time, trust_value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", [tuple(record.values())])
+
+    def write_to_agent_trust_log(self, agent, metric_str, other_agent, trust_value, resource_id=None):
+        record = self.agent_trust_log_record(metric_str, other_agent, trust_value, resource_id)
+        self.insert("INSERT INTO agent_trust_log (agent, date_time, metric_str, other_agent, resource_id, "
+                    "trust_value) VALUES (?, ?, ?, ?, ?, ?)", [(agent,) + tuple(record.values())])
+
+    def close(self):
+        with self.connection_lock:
+            if self.db_connection is not None:
+                self.db_connection.close()
+                self.db_connection = None
+
+    def __getstate__(self):
+        # connection and lock cannot be pickled when the logger is handed over to the scenario run's process
+        state = super().__getstate__()
+        state['db_connection'] = None
+        del state['connection_lock']
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.connection_lock = RLock()
+
+    def __init__(self, scenario_run_id):
+        super().__init__(scenario_run_id)
+        split_index = len(scenario_run_id.split("_")[0]) + 1  # index to cut constant of runId -> 'scenarioRun_'
+        self.folder_name = scenario_run_id[split_index:]
+        self.log_path = Path(f"{LOG_PATH}/{self.folder_name}/")
+        if not self.log_path.is_dir():
+            os.mkdir(self.log_path.absolute())
+        self.db_connection = None
+        self.connection_lock = RLock()
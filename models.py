@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from os import listdir
 from os.path import isfile
 from pathlib import Path
+from threading import Lock
 
 
 class UpdatableInterface(Interface):
@@ -399,9 +400,42 @@ def load_scale_spec(scale_dict):
     return cls
 
 
+# scale classes of this process by their package, such that each scale package is imported once
+scale_classes = {}
+scale_classes_lock = Lock()
+
+
+def scale_class(scale_dict):
+    """
+    Returns the registered scale class of the given scale attributes, which is loaded by `load_scale_spec(scale_dict)`
+    and registered at the first request of its package.
+
+    :param scale_dict: scale object definition
+    :type scale_dict: dict
+    :return: the scale class
+    :raises ModuleNotFoundError: Scale's package was not found on local storage.
+    :raises SyntaxError: Scale implementation is not subclass of Scale and UpdatableInterface.
+    """
+    with scale_classes_lock:
+        if scale_dict['package'] not in scale_classes:
+            scale_classes[scale_dict['package']] = load_scale_spec(scale_dict)
+        return scale_classes[scale_dict['package']]
+
+
+def reload_scale_classes():
+    """
+    Clears the registered scale classes, such that changed scale implementations are imported again at their next
+    request, e.g. during development. Scale objects created before keep their class.
+
+    :rtype: None
+    """
+    with scale_classes_lock:
+        scale_classes.clear()
+
+
 def init_scale_object(scale_dict):
     """
-    Creates a scale object of the given scale attributes by using `load_scale_spec(scale_dict)`.
+    Creates a scale object of the given scale attributes by using the registered class of `scale_class(scale_dict)`.
 
     :param scale_dict: scale object definition
     :type scale_dict: dict
@@ -411,7 +445,7 @@ def init_scale_object(scale_dict):
     :raises SyntaxError: Scale implementation is not subclass of Scale and UpdatableInterface.
     :raises TypeError: Scale object cannot get initialized correctly with scale_dict values.
     """
-    cls = load_scale_spec(scale_dict)
+    cls = scale_class(scale_dict)
     scale_kwargs = {key: value for key, value in scale_dict.items() if key != 'package'}
     scale_object = cls(**scale_kwargs)  # might raises TypeError by class specification
     return scale_object
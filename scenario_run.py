@@ -2,10 +2,17 @@ import json
 import socket
 from contextlib import closing
 import multiprocessing as multiproc
+from concurrent.futures import ThreadPoolExecutor
 
 from models import Observation
+from loggers.basic_logger import BasicLogger
 from exec.agent_server import AgentServer
+from exec.async_agent_server import AsyncAgentServer
 from exec.agent_client import AgentClient
+from exec.connection_pool import connection_pool
+from exec.local_transport import local_transport
+from exec.addresses import unix_socket_path, format_address, parse_address
+from config import AGENT_SERVER_MODE, AGENT_EVAL_WORKERS, AGENT_REQUEST_WORKERS
 
 
 class ScenarioRun(multiproc.Process):
@@ -28,8 +35,8 @@ class ScenarioRun(multiproc.Process):
     def prepare_scenario(self):
         """
         Prepare the scenario run by `1)` logging for all agents their initial trust value logs,
-        `2)` initializing all local agents' server(s), `3)` sending the local discovery to the director,
-        and `4)` receiving and saving the global discovery with all agents' addresses.
+        `2)` initializing all local agents' server(s) as configured by `server_mode`, `3)` sending the local discovery
+        to the director, and `4)` receiving and saving the global discovery with all agents' addresses.
         """
         local_discovery = {}
         # logging for all Agents their trust history values if given
@@ -40,13 +47,31 @@ class ScenarioRun(multiproc.Process):
             #    self.logger.write_bulk_to_agent_topic_trust(agent, self.scenario.agents_with_metric(
             #        'content_trust.topic')[agent])
         # creating servers
+        async_server = AsyncAgentServer() if self.server_mode == 'asyncio' else None
+        if async_server is None:
+            # all agent servers of the scenario run share the thread pools answering their requests
+            self.eval_executor = ThreadPoolExecutor(max_workers=AGENT_EVAL_WORKERS, thread_name_prefix="agent_eval")
+            self.request_executor = ThreadPoolExecutor(max_workers=AGENT_REQUEST_WORKERS,
+                                                       thread_name_prefix="agent_request")
+        connection_pool.ip_address = self.ip_address
         for agent in self.agents_at_supervisor:
             free_port = self.find_free_port()
-            local_discovery[agent] = self.ip_address + ":" + str(free_port)
+            # agents at supervisors of the same host connect to the advertised Unix domain socket instead of TCP
+            unix_path = unix_socket_path(self.ip_address, free_port)
+            local_discovery[agent] = format_address(self.ip_address, free_port, unix_path)
+            if async_server is not None:
+                async_server.add_agent(agent, self.ip_address, free_port, self.scenario.metrics_per_agent[agent],
+                                       self.scenario.scales_per_agent[agent], self.logger, self.observations_done,
+                                       unix_path)
+                continue
             server = AgentServer(agent, self.ip_address, free_port, self.scenario.metrics_per_agent[agent],
-                                 self.scenario.scales_per_agent[agent], self.logger, self.observations_done)
+                                 self.scenario.scales_per_agent[agent], self.logger, self.observations_done,
+                                 self.eval_executor, self.request_executor, unix_path)
             self.threads_server.append(server)
             server.start()
+        if async_server is not None:
+            self.threads_server.append(async_server)
+            async_server.start()
         discovery_message = {"type": "agent_discovery", "scenario_run_id": self.scenario_run_id,
                              "discovery": local_discovery}
         self.send_queue.put(discovery_message)
@@ -86,25 +111,34 @@ class ScenarioRun(multiproc.Process):
             observation_dict = next((obs for obs in self.observations_to_exec if len(obs["before"]) == 0), None)
             if observation_dict is not None:
                 observation = Observation(**observation_dict)
-                ip, port = self.discovery[observation.receiver].split(":")
-                print(f"Sending observation {observation.observation_id} to {ip}:{port}")
-                client_thread = AgentClient(ip, int(port), json.dumps(observation_dict))
-                self.threads_client.append(client_thread)
-                client_thread.start()
+                ip, port, unix_path = parse_address(self.discovery[observation.receiver])
+                local_handler = local_transport.handler(ip, port)
+                if local_handler is not None:
+                    # receivers served within this process get the observation without sockets
+                    print(f"Delivering observation {observation.observation_id} locally to {ip}:{port}")
+                    local_transport.deliver(local_handler, observation)
+                else:
+                    print(f"Sending observation {observation.observation_id} to {ip}:{port}")
+                    client_thread = AgentClient(ip, port, json.dumps(observation_dict), unix_path)
+                    self.threads_client.append(client_thread)
+                    client_thread.start()
                 self.observations_to_exec.remove(observation_dict)
             observation_done_dict = next((obs for obs in self.observations_done), None)
             if observation_done_dict is not None:
+                trust_log, trust_log_dict, trust_log_sequence = self.read_trust_log_delta()
+                receiver_trust_log, receiver_trust_log_dict, receiver_trust_log_sequence = \
+                    self.read_trust_log_delta(observation_done_dict["receiver"])
                 done_message = {
                     "type": "observation_done",
                     "scenario_run_id": self.scenario_run_id,
                     "observation_id": observation_done_dict["observation_id"],
                     "receiver": observation_done_dict["receiver"],
-                    "trust_log": '<br>'.join(self.logger.read_lines_from_trust_log_str()),
-                    "trust_log_dict": self.logger.read_lines_from_trust_log(),
-                    "receiver_trust_log": '<br>'.join(self.logger.read_lines_from_agent_trust_log_str(
-                        observation_done_dict["receiver"])),
-                    "receiver_trust_log_dict": self.logger.read_lines_from_agent_trust_log(
-                        observation_done_dict["receiver"]),
+                    "trust_log": trust_log,
+                    "trust_log_dict": trust_log_dict,
+                    "trust_log_sequence": trust_log_sequence,
+                    "receiver_trust_log": receiver_trust_log,
+                    "receiver_trust_log_dict": receiver_trust_log_dict,
+                    "receiver_trust_log_sequence": receiver_trust_log_sequence,
                 }
                 self.send_queue.put(done_message)
                 self.remove_observation_dependency([observation_done_dict["observation_id"]])
@@ -119,10 +153,16 @@ class ScenarioRun(multiproc.Process):
                     for thread in self.threads_client:
                         if thread.is_alive():
                             thread.join()
+                    local_transport.close()
+                    connection_pool.close()
                     for thread in self.threads_server:
                         thread.end_server()
                         if thread.is_alive():
                             thread.join()
+                    if self.eval_executor is not None:
+                        self.eval_executor.shutdown()
+                        self.request_executor.shutdown()
+                    self.logger.close()
                     self.scenario_runs = False
         end_message = {
             'type': 'scenario_end',
@@ -130,6 +170,31 @@ class ScenarioRun(multiproc.Process):
         }
         self.supervisor_pipe.send(end_message)
 
+    def read_trust_log_delta(self, agent=None):
+        """
+        Reads the entries appended to the supervisor's local trust log, or to `agent`'s trust log if given, since the
+        last call and renders their log strings from the same entries, such that each entry is read and parsed once.
+        If `log_len_filter` is set, only the most recent number of new entries is returned.
+
+        :param agent: Agent to read the trust log of, or None for the supervisor's local trust log.
+        :type agent: str
+        :return: The new log strings joined for the web UI, the new entries as dicts, and the sequence number of the
+            first returned entry within the whole log.
+        :rtype: tuple
+        """
+        cursor, sequence = self.trust_log_cursors.get(agent, (None, 0))
+        if agent is None:
+            records, cursor = self.logger.read_lines_from_trust_log_since(cursor)
+            render = BasicLogger.render_trust_log
+        else:
+            records, cursor = self.logger.read_lines_from_agent_trust_log_since(agent, cursor)
+            render = BasicLogger.render_agent_trust_log
+        self.trust_log_cursors[agent] = (cursor, sequence + len(records))
+        if self.log_len_filter:
+            sequence += max(len(records) - abs(self.log_len_filter), 0)
+            records = self.logger.apply_len_filter(records, self.log_len_filter)
+        return '<br>'.join(f"{render(record)}\n" for record in records), records, sequence
+
     def remove_observation_dependency(self, observations_done):
         """
         Removes any observations given from all `observations_to_exec`'s `before` dependencies.
@@ -142,7 +207,15 @@ class ScenarioRun(multiproc.Process):
             observation["before"] = [obs_id for obs_id in observation["before"] if obs_id not in observations_done]
 
     def __init__(self, scenario_run_id, agents_at_supervisor, scenario, ip_address, send_queue, receive_pipe, logger,
-                 observations_done, supervisor_pipe):
+                 observations_done, supervisor_pipe, log_len_filter=None, server_mode=AGENT_SERVER_MODE):
+        """
+        :param log_len_filter: Number of most recent new trust log lines to send with each observation_done
+            message, or None to send all new trust log lines.
+        :type log_len_filter: int
+        :param server_mode: Either 'threads' to serve each local agent by its own server thread, or 'asyncio' to
+            serve all local agents on one event loop.
+        :type server_mode: str
+        """
         multiproc.Process.__init__(self)
         self.scenario_run_id = scenario_run_id
         self.agents_at_supervisor = agents_at_supervisor
@@ -157,5 +230,13 @@ class ScenarioRun(multiproc.Process):
         self.scenario_runs = False
         self.observations_done = observations_done
         self.supervisor_pipe = supervisor_pipe
+        self.log_len_filter = log_len_filter
+        self.server_mode = server_mode
+        # thread pools of the agent servers in 'threads' mode, created within the scenario run's process
+        self.eval_executor = None
+        self.request_executor = None
+        # per trust log, the logger's cursor after the entries sent and the number of entries sent, where the
+        # supervisor's local trust log is at key None and the agents' trust logs at their names
+        self.trust_log_cursors = {}
         # filter observations that have to start at this supervisor
         self.observations_to_exec = [obs for obs in scenario.observations if obs["sender"] in agents_at_supervisor]
\ No newline at end of file
@@ -6,6 +6,7 @@ import re
 from distutils.util import strtobool
 from models import Scenario
 from scenario_run import ScenarioRun
+from config import AGENT_SERVER_MODE
 
 
 class Supervisor:
@@ -31,9 +32,6 @@ class Supervisor:
                 finished_scenario_run.terminate()
                 finished_scenario_run.join()
                 del self.scenario_runs[finished_scenario_run_id]
-                index_logger = [i for i in range(len(self.logger_semaphores)) if self.logger_semaphores[i]["used_by"] ==
-                                finished_scenario_run_id][0]
-                self.logger_semaphores[index_logger]["used_by"] = ""
                 index_done = [i for i in range(len(self.observations_done)) if self.observations_done[i]["used_by"] ==
                               finished_scenario_run_id][0]
                 self.observations_done[index_done]["used_by"] = ""
@@ -45,14 +43,10 @@ class Supervisor:
                 self.agents_in_use += len(received_msg["agents_at_supervisor"])
                 recv_end, send_end = aioprocessing.AioPipe(False)
                 self.pipe_dict[new_scenario_run_id] = send_end
-                # creating logger for new scenario run with already registered semaphore
-                index_logger, logger_semaphore_dict = next((index, semaphore) for (index, semaphore) in
-                                                           enumerate(self.logger_semaphores) if semaphore["used_by"] == "")
-                logger_semaphore = logger_semaphore_dict["semaphore"]
-                self.logger_semaphores[index_logger]["used_by"] = new_scenario_run_id
+                # creating logger for new scenario run, which locks its logs within the scenario run's process
                 module = importlib.import_module("loggers." + re.sub("([A-Z])", "_\g<1>", self.logger_str).lower()[1:])
                 logger_class = getattr(module, self.logger_str)
-                logger = logger_class(new_scenario_run_id, logger_semaphore)
+                logger = logger_class(new_scenario_run_id)
                 # taking one observations_done list
                 index_done, done_dict = next((index, obs_done_dict) for (index, obs_done_dict) in
                                              enumerate(self.observations_done) if obs_done_dict["used_by"] == "")
@@ -61,11 +55,13 @@ class Supervisor:
                 # create and start scenario_run
                 new_scenario_run = ScenarioRun(new_scenario_run_id, received_msg["agents_at_supervisor"],
                                                Scenario(**received_msg["scenario"]), self.ip_address, self.send_queue,
-                                               recv_end, logger, observations_done, self.pipe_dict["supervisor"])
+                                               recv_end, logger, observations_done, self.pipe_dict["supervisor"],
+                                               self.log_len_filter, self.server_mode)
                 self.scenario_runs[new_scenario_run_id] = new_scenario_run
                 new_scenario_run.start()
 
-    def __init__(self, ip_address, max_agents, director_hostname, connector, logger_str, hostname='', sec_conn=False):
+    def __init__(self, ip_address, max_agents, director_hostname, connector, logger_str, hostname='', sec_conn=False,
+                 log_len_filter=None, server_mode=AGENT_SERVER_MODE):
         self.ip_address = ip_address
         self.hostname = hostname
         self.director_hostname = director_hostname
@@ -74,13 +70,13 @@ class Supervisor:
         self.takes_new_scenarios = True
         self.scenario_runs = {}
         self.logger_str = logger_str
+        self.log_len_filter = log_len_filter
+        self.server_mode = server_mode
         # setup multiprocessing environment
         self.send_queue = aioprocessing.AioQueue()
         self.manager = multiproc.Manager()
         self.pipe_dict = self.manager.dict()
         self.receive_pipe, self.pipe_dict["supervisor"] = aioprocessing.AioPipe(False)
-        # setup logger semaphores for all possible scenario runs
-        self.logger_semaphores = [{"semaphore": self.manager.Semaphore(1), "used_by": ""} for i in range(max_agents)]
         # setup observations_done lists
         self.observations_done = [{"list": self.manager.list(), "used_by": ""} for i in range(max_agents)]
         # create supervisor info for connector
@@ -104,8 +100,15 @@ if __name__ == '__main__':
                         help="The IP address of the supervisor itself.")
     parser.add_argument("-hn", "--host", default="",
                         help="The hostname of the supervisor itself. It serves yet only as identifier in logs.")
-    parser.add_argument("-log", "--logger", default="FileLogger", choices=['FileLogger'],
+    parser.add_argument("-log", "--logger", default="FileLogger",
+                        choices=['FileLogger', 'MemoryLogger', 'SqliteLogger'],
                         help="The logger class to use for logging trust values during a scenario run.")
+    parser.add_argument("-llf", "--log-len-filter", type=int, default=None,
+                        help="The number of most recent new trust log lines sent to the director per observation. "
+                             "All new lines are sent if not given.")
+    parser.add_argument("-sm", "--server-mode", default=AGENT_SERVER_MODE, choices=['threads', 'asyncio'],
+                        help="Whether each agent is served by its own threads or all agents of a scenario run on one "
+                             "asyncio event loop.")
     parser.add_argument("max_agents", type=int,
                         help="The maximal number of agents existing in parallel under this supervisor.")
     parser.add_argument("-wss", "--sec-socket", type=lambda x: bool(strtobool(x)), nargs='?', const=True,
@@ -115,5 +118,5 @@ if __name__ == '__main__':
     multiproc.set_start_method('spawn')
     # init supervisor as class and execute
     supervisor = Supervisor(args.address, args.max_agents, args.director, args.connector, args.logger, args.host,
-                            args.sec_socket)
+                            args.sec_socket, args.log_len_filter, args.server_mode)
     supervisor.run()
@@ -1,5 +1,3 @@
-from datetime import datetime
-from loggers.basic_logger import BasicLogger
 from models import Scale
 
 
@@ -21,14 +19,9 @@ def direct_experience(agent, resource_id, recency_limit, scale, logger):
     :rtype: float or int
     """
 
-    history_lines = logger.read_lines_from_agent_history(agent)
-    # getting all history values of the agent respective to the evaluated resource and filters them based on their age
-    # and the recency limit set in the trust preferences of the agent
-    history = [float(entry['trust_value']) for entry in history_lines if entry['resource_id'] == resource_id and
-               datetime.strptime(entry['date_time'], BasicLogger.get_time_format_string()) > recency_limit and
-               entry['trust_value'] != 'None']
-    # calculate direct experience
-    direct_xp = sum(history) / len(history) if len(history) > 0 else None
+    # getting the mean of all history values of the agent respective to the evaluated resource filtered based on their
+    # age and the recency limit set in the trust preferences of the agent
+    direct_xp = logger.read_mean_from_agent_history_by_resource(agent, resource_id, recency_limit)
     return direct_xp
 
 
@@ -49,10 +42,24 @@ def get_combined_direct_experience_for_agent(agent, third_agent, logger, recency
     :rtype: float or int
     """
 
-    history_lines = logger.read_lines_from_agent_history(agent)
-    history = [float(entry['trust_value']) for entry in history_lines if entry['other_agent'] == third_agent and
-               datetime.strptime(entry['date_time'], BasicLogger.get_time_format_string()) > recency_limit and
-               entry['trust_value'] != 'None']
-    # calculate direct experience
-    direct_xp = sum(history) / len(history) if len(history) > 0 else None
+    direct_xp = logger.read_mean_from_agent_history_by_other_agent(agent, third_agent, recency_limit)
     return direct_xp
+
+
+def get_combined_direct_experiences(agent, logger, recency_limit, scale):
+    """
+    Calculates the average of recent direct experience trust values per agent for resources provided by them, all
+    at once in one pass over the agent's history.
+    :param agent: The agent that is evaluating the resource.
+    :type agent: str
+    :param logger: The current logger object.
+    :type logger: BasicLogger
+    :param recency_limit: A datetime object which is used for "forgetting" old history entries
+    :type recency_limit: datetime
+    :param scale: The Scale object to be used by the agent.
+    :type scale: Scale
+    :return: Direct Experience average value by each agent with recent history entries.
+    :rtype: dict
+    """
+
+    return logger.read_means_from_agent_history_per_other_agent(agent, recency_limit)
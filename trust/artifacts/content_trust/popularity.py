@@ -1,12 +1,11 @@
 from trust.artifacts.content_trust.direct_experience import direct_experience
 from trust.artifacts.content_trust.recommendation import ask_for_recommendations
-from exec.ask_others import ask_other_agent
-from datetime import datetime
-from loggers.basic_logger import BasicLogger
+from trust.trust_protocol import PeerRequests
 from models import Scale
 
 
-def popularity(agent, other_agent, resource_id, peers, discovery, scale, recency_limit):
+def popularity(agent, other_agent, resource_id, peers, discovery, scale, recency_limit, cancel_event=None,
+               peer_requests=None):
     """
     Asking other agent for its popularity value and weighting it with other agent's direct XP.
 
@@ -24,17 +23,21 @@ def popularity(agent, other_agent, resource_id, peers, discovery, scale, recency
     :type scale: Scale
     :param recency_limit: A datetime object which is used for "forgetting" old history entries
     :type recency_limit: datetime
+    :param cancel_event: Event set when the evaluation is cancelled and peers need not be waited for anymore.
+    :type cancel_event: threading.Event
+    :param peer_requests: The requests to peers shared by the metrics of the evaluation, or None to ask alone.
+    :type peer_requests: PeerRequests
     :return: The popularity trust value weighted by other agent's direct XP.
     :rtype: float or int
     """
-    message = f"popularity_{resource_id}_{recency_limit.strftime(BasicLogger.get_time_format_string())}"
+    if peer_requests is None:
+        peer_requests = PeerRequests(discovery, resource_id, recency_limit, ('popularity',), cancel_event)
     known = 0
 
     agents_to_ask = [third_agent for third_agent in peers if third_agent != agent and third_agent != other_agent]
-    for peer in agents_to_ask:
-        remote_ip, remote_port = discovery[peer].split(':')
-        received = ask_other_agent(remote_ip, int(remote_port), message)
-        if bool(received):
+    # peers not answering in time are counted as not knowing the resource
+    for received in peer_requests.responses('popularity', agents_to_ask).values():
+        if received:
             known += 1
 
     percentage = known / len(peers)
@@ -61,9 +64,8 @@ def popularity_response(agent, resource_id, recency_limit, scale, logger):
     :return: The popularity trust value of agent itself.
     :rtype: bool
     """
-    history_lines = logger.read_lines_from_agent_history(agent)
-    history = [1 for entry in history_lines if entry['resource_id'] == resource_id and
-               datetime.strptime(entry['date_time'], BasicLogger.get_time_format_string()) > recency_limit and
-               entry['trust_value'] != 'None' and float(entry['trust_value']) >= scale.minimum_to_trust_others()]
+    history_lines = logger.read_lines_from_agent_history_by_resource(agent, resource_id, recency_limit)
+    history = [1 for entry in history_lines if
+               entry['trust_value'] is not None and entry['trust_value'] >= scale.minimum_to_trust_others()]
 
     return len(history) > 0
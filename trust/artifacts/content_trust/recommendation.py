@@ -1,13 +1,12 @@
 from dis import disco
-from exec.ask_others import ask_other_agent
-from trust.artifacts.content_trust.direct_experience import get_combined_direct_experience_for_agent, direct_experience
-from datetime import datetime
-from loggers.basic_logger import BasicLogger
+from trust.trust_protocol import PeerRequests
+from trust.artifacts.content_trust.direct_experience import get_combined_direct_experiences, direct_experience
 from models import Scale
 import statistics
 
 
-def recommendation(agent, other_agent, resource_id, scale, logger, discovery, recency_limit):
+def recommendation(agent, other_agent, resource_id, scale, logger, discovery, recency_limit, cancel_event=None,
+                   peer_requests=None):
     """
     Get recommendations on other agent of third agents and average them to one recommendation value.
 
@@ -25,24 +24,31 @@ def recommendation(agent, other_agent, resource_id, scale, logger, discovery, re
     :type discovery: dict
     :param recency_limit: A datetime object which is used for "forgetting" old history entries
     :type recency_limit: datetime
+    :param cancel_event: Event set when the evaluation is cancelled and third agents need not be waited for anymore.
+    :type cancel_event: threading.Event
+    :param peer_requests: The requests to peers shared by the metrics of the evaluation, or None to ask alone.
+    :type peer_requests: PeerRequests
     :return: The Recommendation trust value.
     :rtype: float or int
     """
 
+    # the direct experience with all third agents is calculated once for selecting and weighting them
+    combined_experiences = get_combined_direct_experiences(agent, logger, recency_limit, scale)
     agents_to_ask = []
     for third_agent in discovery:
         if third_agent != agent and third_agent != other_agent:
-            combined = get_combined_direct_experience_for_agent(
-                agent, third_agent, logger, recency_limit, scale)
+            combined = combined_experiences.get(third_agent)
             if combined != None and combined >= scale.minimum_to_trust_others():
                 agents_to_ask.append(third_agent)
 
     recommendations = ask_for_recommendations(
-        agent, resource_id, agents_to_ask, scale, logger, discovery, recency_limit)
+        agent, resource_id, agents_to_ask, scale, logger, discovery, recency_limit, combined_experiences, cancel_event,
+        peer_requests)
     return statistics.median(recommendations) if len(recommendations) > 0 else None
 
 
-def ask_for_recommendations(agent, resource_id, agents_to_ask, scale, logger, discovery, recency_limit):
+def ask_for_recommendations(agent, resource_id, agents_to_ask, scale, logger, discovery, recency_limit,
+                            combined_experiences=None, cancel_event=None, peer_requests=None):
     """
     Asking all agents to ask about their recommendation on other agent and listing them.
 
@@ -60,18 +66,24 @@ def ask_for_recommendations(agent, resource_id, agents_to_ask, scale, logger, di
     :type discovery: dict
     :param recency_limit: A datetime object which is used for "forgetting" old history entries
     :type recency_limit: datetime
+    :param combined_experiences: Direct experience values by third agent, which are calculated if not given.
+    :type combined_experiences: dict
+    :param cancel_event: Event set when the evaluation is cancelled and third agents need not be waited for anymore.
+    :type cancel_event: threading.Event
+    :param peer_requests: The requests to peers shared by the metrics of the evaluation, or None to ask alone.
+    :type peer_requests: PeerRequests
     :return: The recommendation trust values of third agents on other_agent.
     :rtype: list
     """
+    if combined_experiences is None:
+        combined_experiences = get_combined_direct_experiences(agent, logger, recency_limit, scale)
+    if peer_requests is None:
+        peer_requests = PeerRequests(discovery, resource_id, recency_limit, ('recommendation',), cancel_event)
     recommendations = []
-    message = f"recommendation_{resource_id}_{datetime.strftime(recency_limit, BasicLogger.get_time_format_string())}"
-    for third_agent in agents_to_ask:
-        remote_ip, remote_port = discovery[third_agent].split(":")
-        response = ask_other_agent(remote_ip, int(remote_port), message)
-        if response != 'None':
-            received_value = float(response)
-            combined = get_combined_direct_experience_for_agent(
-                agent, third_agent, logger, recency_limit, scale)
+    # third agents not answering in time are left out like those without a recommendation
+    for third_agent, received_value in peer_requests.responses('recommendation', agents_to_ask).items():
+        if received_value is not None:
+            combined = combined_experiences.get(third_agent)
             if combined != None:
                 recommendations.append(combined * received_value)
 
@@ -1,6 +1,4 @@
 from models import Scale
-from loggers.basic_logger import BasicLogger
-from datetime import datetime
 
 
 def topic(agent, other_agent, trusted_topics, current_topics, recency_limit, logger, scale):
@@ -31,26 +29,18 @@ def topic(agent, other_agent, trusted_topics, current_topics, recency_limit, log
 
     topic_values = []
 
-    topic_history_lines = logger.read_lines_from_agent_topic_trust(agent)
-    topic_history = {}
-    for entry in topic_history_lines:
-        if datetime.strptime(entry['date_time'], BasicLogger.get_time_format_string()) > recency_limit:
-            if entry['other_agent'] == other_agent:
-                if entry['topic'] not in topic_history or topic_history[entry['topic']] is None:
-                    topic_history[entry['topic']] = []
-                topic_history[entry['topic']].append(float(entry['trust_value']))
+    # sum and count of the topic trust history per topic
+    topic_history = logger.read_topic_trust_sums_by_other_agent(agent, other_agent, current_topics, recency_limit)
 
     for topic in current_topics:
-        # get trust value from trust preferences
-        history_values = []
+        total, count = topic_history.get(topic, (0, 0))
+        # add trust value from trust preferences
         if trusted_topics is not None and other_agent in trusted_topics and topic in trusted_topics[other_agent]:
-            history_values.append(trusted_topics[other_agent][topic])
+            total += trusted_topics[other_agent][topic]
+            count += 1
 
-        if topic in topic_history:
-            history_values += topic_history[topic]
-
-        if len(history_values) > 0:
-            topic_mean = sum(history_values) / len(history_values)
+        if count > 0:
+            topic_mean = total / count
             topic_values.append(topic_mean)
 
     if len(topic_values) > 0:
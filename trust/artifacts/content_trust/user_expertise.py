@@ -1,11 +1,10 @@
 from models import Scale
 from trust.artifacts.content_trust.recommendation import ask_for_recommendations
-from loggers.basic_logger import BasicLogger
-from datetime import datetime
 import statistics
 
 
-def user_expertise(agent, other_agent, resource_id, topics, discovery, scale, logger, recency_limit):
+def user_expertise(agent, other_agent, resource_id, topics, discovery, scale, logger, recency_limit,
+                   cancel_event=None, peer_requests=None):
     """
     Calculates the user expertise value by asking topic experts for their recommendation value for the evaluated
     resource.
@@ -26,6 +25,10 @@ def user_expertise(agent, other_agent, resource_id, topics, discovery, scale, lo
     :type logger: BasicLogger
     :param recency_limit: A datetime object which is used for "forgetting" old history entries
     :type recency_limit: datetime
+    :param cancel_event: Event set when the evaluation is cancelled and experts need not be waited for anymore.
+    :type cancel_event: threading.Event
+    :param peer_requests: The requests to peers shared by the metrics of the evaluation, or None to ask alone.
+    :type peer_requests: PeerRequests
     :return: The User Expertise trust value.
     :rtype: float or int
     :return:
@@ -34,23 +37,11 @@ def user_expertise(agent, other_agent, resource_id, topics, discovery, scale, lo
     if len(topics) == 0:
         return None
 
-    agents_to_ask = []
+    # agents with a recent topic trust value above the minimum to trust others as set by the scale for any of the
+    # topics of the evaluated resource, except the current interaction partner, are the expert users
+    agents_to_ask = [expert for expert in logger.read_topic_experts(agent, topics, scale.minimum_to_trust_others(),
+                                                                    recency_limit) if expert != other_agent]
 
-    # getting all history values of the agent respective to the evaluated resource and filters them based on
-    # their age and the recency limit set in the trust preferences of the agent
-    history_lines = logger.read_lines_from_agent_topic_trust(agent)
-
-    # pre-filter history_lines with the recency_limit
-    for entry in [line for line in history_lines if datetime.strptime(line['date_time'], BasicLogger.get_time_format_string()) > recency_limit]:        
-        # filter by topic name
-        if entry['topic'] in topics:
-            # check whether the topic trust value is above the minimum to trust others as set by the scale and
-            # test if the agents_to_ask list already contains the agent of the current entry or is the current
-            # interaction partner
-            if float(entry['trust_value']) >= scale.minimum_to_trust_others() \
-                    and entry['other_agent'] not in agents_to_ask and entry['other_agent'] != other_agent:
-                # adds the agent to the list of expert users
-                agents_to_ask.append(entry['other_agent'])
-
-    expertise_values = ask_for_recommendations(agent, resource_id, agents_to_ask, scale, logger, discovery, recency_limit)
+    expertise_values = ask_for_recommendations(agent, resource_id, agents_to_ask, scale, logger, discovery,
+                                               recency_limit, cancel_event=cancel_event, peer_requests=peer_requests)
     return statistics.median(expertise_values) if len(expertise_values) > 0 else None
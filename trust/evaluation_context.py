@@ -0,0 +1,141 @@
+from threading import RLock
+from loggers.basic_logger import BasicLogger
+
+
+class EvaluationContext:
+    """
+    Provides the read methods of `BasicLogger` used by the trust metrics within one evaluation of an agent, such that
+    all metrics share their log reads. The agent's history and topic trust are read at most once per evaluation,
+    already cut to the recency limit, and all groupings and means derived from them are memoized. For loggers with
+    indexed reads, the filtered queries are passed to the logger once each instead. Reads about other agents or with
+    other recency limits are passed to the logger.
+    """
+    def cached(self, key, load):
+        """
+        :param key: Identifier of the value within the evaluation.
+        :param load: Function without parameters loading the value.
+        :type load: Callable
+        :return: The value loaded at the first call with `key` in this evaluation.
+        """
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = load()
+            return self.values[key]
+
+    def lines(self, log):
+        """
+        :param log: Either 'history' or 'topic_trust'.
+        :type log: str
+        :return: The agent's lines of the log within the recency limit.
+        :rtype: list
+        """
+        read = self.logger.read_lines_from_agent_history if log == 'history' else \
+            self.logger.read_lines_from_agent_topic_trust
+        return self.cached(log, lambda: self.logger.filter_recency(read(self.agent), self.recency_limit))
+
+    def grouped_lines(self, log, key):
+        """
+        :param log: Either 'history' or 'topic_trust'.
+        :type log: str
+        :param key: Key of the lines to group by.
+        :type key: str
+        :return: The agent's lines of the log within the recency limit by their value at `key`.
+        :rtype: dict
+        """
+        def group():
+            groups = {}
+            for entry in self.lines(log):
+                groups.setdefault(entry[key], []).append(entry)
+            return groups
+        return self.cached((log, key), group)
+
+    def shared_read(self, agent, recency_limit, name, arguments, load):
+        """
+        Returns the memoized result of the logger's read method `name`, loaded from the shared log reads by `load`
+        or read by the logger once if it has indexed reads. Reads not shareable within the evaluation are passed to
+        the logger.
+
+        :param agent: Agent whose log is read.
+        :type agent: str
+        :param recency_limit: Lines have to be newer than this point in time.
+        :type recency_limit: datetime
+        :param name: Name of the logger's read method.
+        :type name: str
+        :param arguments: Arguments of the read method besides agent and recency_limit.
+        :type arguments: tuple
+        :param load: Function without parameters loading the result from the shared log reads.
+        :type load: Callable
+        :return: The result of the read method.
+        """
+        read = getattr(self.logger, name)
+        if agent != self.agent or recency_limit != self.recency_limit:
+            return read(agent, *arguments, recency_limit)
+        if self.logger.indexed_reads:
+            return self.cached((name,) + arguments, lambda: read(agent, *arguments, recency_limit))
+        return self.cached((name,) + arguments, load)
+
+    def read_lines_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        return list(self.shared_read(agent, recency_limit, 'read_lines_from_agent_history_by_resource', (resource_id,),
+                                     lambda: self.grouped_lines('history', 'resource_id').get(resource_id, [])))
+
+    def read_lines_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        return list(self.shared_read(agent, recency_limit, 'read_lines_from_agent_history_by_other_agent',
+                                     (other_agent,),
+                                     lambda: self.grouped_lines('history', 'other_agent').get(other_agent, [])))
+
+    def read_lines_from_agent_topic_trust_by_other_agent(self, agent, other_agent, recency_limit=None):
+        return list(self.shared_read(agent, recency_limit, 'read_lines_from_agent_topic_trust_by_other_agent',
+                                     (other_agent,),
+                                     lambda: self.grouped_lines('topic_trust', 'other_agent').get(other_agent, [])))
+
+    def read_lines_from_agent_topic_trust_by_topic(self, agent, topic, recency_limit=None):
+        return list(self.shared_read(agent, recency_limit, 'read_lines_from_agent_topic_trust_by_topic', (topic,),
+                                     lambda: self.grouped_lines('topic_trust', 'topic').get(topic, [])))
+
+    def read_topic_trust_sums_by_other_agent(self, agent, other_agent, topics, recency_limit=None):
+        return dict(self.shared_read(agent, recency_limit, 'read_topic_trust_sums_by_other_agent',
+                                     (other_agent, tuple(topics)),
+                                     lambda: BasicLogger.topic_trust_sums(
+                                         self.grouped_lines('topic_trust', 'other_agent').get(other_agent, []),
+                                         topics)))
+
+    def read_topic_experts(self, agent, topics, minimum, recency_limit=None):
+        def experts():
+            topic_lines = self.grouped_lines('topic_trust', 'topic')
+            return BasicLogger.topic_experts([entry for topic in topics for entry in topic_lines.get(topic, [])],
+                                             minimum)
+        return list(self.shared_read(agent, recency_limit, 'read_topic_experts', (tuple(topics), minimum), experts))
+
+    def read_mean_from_agent_history_by_resource(self, agent, resource_id, recency_limit=None):
+        return self.shared_read(agent, recency_limit, 'read_mean_from_agent_history_by_resource', (resource_id,),
+                                lambda: BasicLogger.mean_trust_value(
+                                    self.grouped_lines('history', 'resource_id').get(resource_id, [])))
+
+    def read_mean_from_agent_history_by_other_agent(self, agent, other_agent, recency_limit=None):
+        return self.shared_read(agent, recency_limit, 'read_mean_from_agent_history_by_other_agent', (other_agent,),
+                                lambda: BasicLogger.mean_trust_value(
+                                    self.grouped_lines('history', 'other_agent').get(other_agent, [])))
+
+    def read_means_from_agent_history_per_other_agent(self, agent, recency_limit=None):
+        def means():
+            values = {other_agent: BasicLogger.mean_trust_value(lines)
+                      for other_agent, lines in self.grouped_lines('history', 'other_agent').items()}
+            return {other_agent: mean for other_agent, mean in values.items() if mean is not None}
+        return dict(self.shared_read(agent, recency_limit, 'read_means_from_agent_history_per_other_agent', (),
+                                     means))
+
+    def __init__(self, agent, logger, recency_limit):
+        """
+        :param agent: The agent which calculates the trust.
+        :type agent: str
+        :param logger: The logger object to be used by the agent.
+        :type logger: BasicLogger
+        :param recency_limit: The recency limit of the agent's trust preferences.
+        :type recency_limit: datetime
+        """
+        self.agent = agent
+        self.logger = logger
+        self.recency_limit = recency_limit
+        self.values = {}
+        # metrics of one evaluation run concurrently
+        self.lock = RLock()
@@ -0,0 +1,286 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Event, Lock
+from types import MappingProxyType
+from trust.artifacts.content_trust.recommendation import recommendation as content_trust_recommendation
+from trust.artifacts.content_trust.direct_experience import direct_experience as content_trust_direct_experience
+from trust.artifacts.content_trust.popularity import popularity as content_trust_popularity
+from trust.artifacts.content_trust.authority import authority as content_trust_authority
+from trust.artifacts.content_trust.topic import topic as content_trust_topic
+from trust.artifacts.content_trust.provenance import provenance as content_trust_provenance
+from trust.artifacts.content_trust.age import age_check as content_trust_age
+from trust.artifacts.content_trust.related_recources import related as content_trust_related_resources
+from trust.artifacts.content_trust.user_expertise import user_expertise as content_trust_user_expertise
+from trust.artifacts.final_trust import weighted_avg_final_trust
+from trust.trust_protocol import PeerRequests
+from config import METRIC_WORKERS
+
+# thread pool shared by all agents of the scenario run's process to calculate metrics doing I/O
+metric_executor = None
+metric_executor_lock = Lock()
+
+
+class Metric:
+    """
+    Describes one trust metric of the registry by the inputs it calculates its value from, when it is used and whether
+    it does I/O, such that metrics doing I/O are calculated concurrently to all others.
+    The inputs available are: agent, other_agent, observation, agent_behavior, scale, logger, context, discovery,
+    peers, resource_id, recency_limit, cancel_event and peer_requests, where metrics reading logs use the context
+    sharing log reads and metrics asking peers use the peer requests sharing one batch message per peer within the
+    evaluation.
+    """
+    def is_given(self, details):
+        """
+        :param details: The details of the evaluated observation.
+        :type details: dict
+        :return: Whether the observation gives the detail the metric requires, if any.
+        :rtype: bool
+        """
+        return self.detail is None or self.detail in details
+
+    def calculate(self, inputs):
+        """
+        :param inputs: All inputs of the evaluation by their name.
+        :type inputs: dict
+        :return: The value of the metric calculated from its declared inputs.
+        :rtype: float or int or None
+        """
+        return self.function(**{name: inputs[name] for name in self.inputs})
+
+    def __init__(self, name, inputs, function, configured, detail=None, does_io=False, rejects=None,
+                 log_rejected=True, is_final_input=None, peer_operations=()):
+        """
+        :param name: Name of the metric as used in agent behaviors and logs.
+        :type name: str
+        :param inputs: Names of the evaluation inputs `function` receives as keyword arguments.
+        :type inputs: tuple
+        :param function: Calculates the metric's value.
+        :type function: Callable
+        :param configured: Decides by the agent behavior whether the metric is used by the agent.
+        :type configured: Callable
+        :param detail: Key of the observation's details required to use the metric, or None if not required.
+        :type detail: str
+        :param does_io: Whether the metric asks other agents.
+        :type does_io: bool
+        :param rejects: Decides by the metric plan, scale and value whether the observation is rejected and
+        evaluated with the minimum trust value, or None if the metric never rejects.
+        :type rejects: Callable
+        :param log_rejected: Whether the value is logged if the observation is rejected.
+        :type log_rejected: bool
+        :param is_final_input: Decides by the metric plan whether the value is used for the final trust value,
+        or None if always used.
+        :type is_final_input: Callable
+        :param peer_operations: The trust protocol operations the metric asks peers for.
+        :type peer_operations: tuple
+        """
+        self.name = name
+        self.inputs = inputs
+        self.function = function
+        self.configured = configured
+        self.detail = detail
+        self.does_io = does_io
+        self.rejects = rejects
+        self.log_rejected = log_rejected
+        self.is_final_input = is_final_input
+        self.peer_operations = peer_operations
+
+
+def detail_metric(name):
+    """
+    :param name: Name of the metric.
+    :type name: str
+    :return: The metric whose value is given in the observation's details.
+    :rtype: Metric
+    """
+    return Metric(name, ('observation',), lambda observation: observation.details[name], lambda behavior: True,
+                  detail=name)
+
+
+def popularity_peers(agent_behavior, discovery):
+    """
+    :param agent_behavior: Metrics to be used the agent.
+    :type agent_behavior: dict
+    :param discovery: Addresses of all agents within the scenario.
+    :type discovery: dict
+    :return: The peer group asked for the popularity, which is all agents of the scenario if not configured.
+    :rtype: list
+    """
+    if 'content_trust.popularity' in agent_behavior and 'peers' in agent_behavior['content_trust.popularity']:
+        return agent_behavior['content_trust.popularity']['peers']
+    return discovery.keys()
+
+
+# all metrics in order of their evaluation and logging
+METRICS = [
+    detail_metric('content_trust.bias'),
+    detail_metric('content_trust.specificity'),
+    detail_metric('content_trust.likelihood'),
+    detail_metric('content_trust.incentive'),
+    Metric('content_trust.deception', ('observation',),
+           lambda observation: observation.details['content_trust.deception'],
+           lambda behavior: 'content_trust.deception' in behavior, detail='content_trust.deception',
+           # deceptive
+           rejects=lambda plan, scale, value: value < plan.deception_threshold, log_rejected=False),
+    Metric('content_trust.age', ('agent_behavior', 'observation', 'scale'), content_trust_age,
+           lambda behavior: 'content_trust.max_lifetime_seconds' in behavior,
+           rejects=lambda plan, scale, value: plan.enforce_lifetime and value < scale.maximum_value(),
+           is_final_input=lambda plan: not plan.enforce_lifetime),
+    Metric('content_trust.authority', ('agent_behavior', 'other_agent', 'scale'),
+           lambda agent_behavior, other_agent, scale: content_trust_authority(
+               agent_behavior['content_trust.authority'], other_agent, scale),
+           lambda behavior: 'content_trust.authority' in behavior),
+    Metric('content_trust.topic', ('agent', 'other_agent', 'agent_behavior', 'observation', 'recency_limit', 'context',
+                                   'scale'),
+           lambda agent, other_agent, agent_behavior, observation, recency_limit, context, scale: content_trust_topic(
+               agent, other_agent, agent_behavior['content_trust.topic'], observation.details['content_trust.topics'],
+               recency_limit, context, scale),
+           lambda behavior: 'content_trust.topic' in behavior),
+    Metric('content_trust.provenance', ('observation', 'agent_behavior', 'scale'),
+           lambda observation, agent_behavior, scale: content_trust_provenance(
+               observation.authors, agent_behavior['content_trust.provenance'], scale),
+           lambda behavior: 'content_trust.provenance' in behavior),
+    Metric('content_trust.direct_experience', ('agent', 'resource_id', 'recency_limit', 'scale', 'context'),
+           lambda agent, resource_id, recency_limit, scale, context: content_trust_direct_experience(
+               agent, resource_id, recency_limit, scale, context),
+           lambda behavior: 'content_trust.direct_experience' in behavior),
+    Metric('content_trust.recommendation', ('agent', 'other_agent', 'resource_id', 'scale', 'context', 'discovery',
+                                            'recency_limit', 'cancel_event', 'peer_requests'),
+           lambda agent, other_agent, resource_id, scale, context, discovery, recency_limit, cancel_event,
+           peer_requests: content_trust_recommendation(agent, other_agent, resource_id, scale, context, discovery,
+                                                       recency_limit, cancel_event, peer_requests),
+           lambda behavior: 'content_trust.recommendation' in behavior, does_io=True,
+           peer_operations=('recommendation',)),
+    Metric('content_trust.related_resources', ('agent', 'observation', 'recency_limit', 'scale', 'context'),
+           lambda agent, observation, recency_limit, scale, context: content_trust_related_resources(
+               agent, observation.details['content_trust.related_resources'], recency_limit, scale, context),
+           lambda behavior: 'content_trust.related_resources' in behavior),
+    Metric('content_trust.user_expertise', ('agent', 'other_agent', 'resource_id', 'observation', 'discovery',
+                                            'scale', 'context', 'recency_limit', 'cancel_event', 'peer_requests'),
+           lambda agent, other_agent, resource_id, observation, discovery, scale, context, recency_limit, cancel_event,
+           peer_requests: content_trust_user_expertise(
+               agent, other_agent, resource_id, observation.details['content_trust.topics'], discovery, scale, context,
+               recency_limit, cancel_event, peer_requests),
+           lambda behavior: 'content_trust.user_expertise' in behavior, does_io=True,
+           peer_operations=('recommendation',)),
+    Metric('content_trust.popularity', ('agent', 'other_agent', 'resource_id', 'peers', 'discovery', 'scale',
+                                        'recency_limit', 'cancel_event', 'peer_requests'), content_trust_popularity,
+           lambda behavior: 'content_trust.popularity' in behavior, does_io=True, peer_operations=('popularity',)),
+]
+
+
+class MetricPlan:
+    """
+    The trust evaluation of one agent compiled once from its behavior and discovery, such that evaluating an
+    observation only executes the plan instead of inspecting the agent behavior again. It holds the metrics configured
+    in order of evaluation, the resolved recency limit, peers, thresholds and final trust weights and is not changed
+    after compilation, but compiled anew if the discovery changes.
+    """
+    def metrics_for(self, details):
+        """
+        :param details: The details of the evaluated observation.
+        :type details: dict
+        :return: The metrics of the plan used to evaluate an observation with `details` in order of evaluation.
+        :rtype: list
+        """
+        return [metric for metric in self.metrics if metric.is_given(details)]
+
+    def cooperation_threshold(self, details):
+        """
+        :param details: The details of the evaluated observation.
+        :type details: dict
+        :return: The cooperation threshold of the observation's context level, or None if not given or configured.
+        :rtype: float or int or None
+        """
+        if self.context_values is None or 'content_trust.context_level' not in details:
+            return None
+        return self.context_values[details['content_trust.context_level']]
+
+    def final_trust(self, trust_values):
+        """
+        :param trust_values: The values by metric name to use for the final trust value, without None values.
+        :type trust_values: dict
+        :return: The final trust value, or None if the agent behavior has no final trust calculation.
+        :rtype: float or int or None
+        """
+        if self.final_name == 'weighted_average':
+            return weighted_avg_final_trust(trust_values, self.final_weights, None)
+        return None
+
+    def __init__(self, agent_behavior, discovery):
+        """
+        :param agent_behavior: Metrics to be used the agent.
+        :type agent_behavior: dict
+        :param discovery: Addresses of all agents within the scenario.
+        :type discovery: dict
+        """
+        self.agent_behavior = agent_behavior
+        self.metrics = tuple(metric for metric in METRICS if metric.configured(agent_behavior))
+        # operations asked from each peer in one batch message
+        self.peer_operations = tuple(dict.fromkeys(operation for metric in self.metrics
+                                                   for operation in metric.peer_operations))
+        self.recency_limit = datetime.fromtimestamp(agent_behavior.get('content_trust.recency_age_limit', 0))
+        self.peers = tuple(popularity_peers(agent_behavior, discovery))
+        self.deception_threshold = agent_behavior.get('content_trust.deception')
+        self.enforce_lifetime = agent_behavior.get('content_trust.enforce_lifetime', False)
+        self.context_values = agent_behavior.get('content_trust.context_values')
+        final = agent_behavior['__final__']
+        self.final_name = final['name'] if final else None
+        self.final_weights = MappingProxyType({metric.name: final['weights'].get(metric.name, 1.0)
+                                               for metric in self.metrics}) if self.final_name == 'weighted_average' \
+            else MappingProxyType({})
+
+
+def evaluate_metrics(plan, metrics, inputs):
+    """
+    Calculates all metrics and logs their values to the agent's trust log in order of `metrics`.
+    All metrics up to the last one able to reject the observation are calculated one after another first, such that
+    a rejected observation never starts asking other agents. Afterwards, the metrics doing I/O are started
+    concurrently, while all other metrics are calculated meanwhile. If calculating any metric fails, the outstanding
+    requests to other agents are cancelled instead of waited for.
+
+    :param plan: The metric plan of the evaluating agent.
+    :type plan: MetricPlan
+    :param metrics: The metrics of the plan used in the evaluation in order of evaluation.
+    :type metrics: list
+    :param inputs: All inputs of the evaluation by their name, where cancel_event and peer_requests are set by this
+    function.
+    :type inputs: dict
+    :return: Whether the observation was rejected and the values by metric name to use for the final trust value.
+    :rtype: tuple
+    """
+    global metric_executor
+    logger, agent, other_agent, resource_id = inputs['logger'], inputs['agent'], inputs['other_agent'], \
+        inputs['resource_id']
+    scale = inputs['scale']
+    inputs['cancel_event'] = Event()
+    inputs['peer_requests'] = PeerRequests(inputs['discovery'], resource_id, inputs['recency_limit'],
+                                           plan.peer_operations, inputs['cancel_event'])
+    trust_values = {}
+    gate_end = max([index + 1 for index, metric in enumerate(metrics) if metric.rejects is not None] + [0])
+    for metric in metrics[:gate_end]:
+        value = metric.calculate(inputs)
+        rejected = metric.rejects is not None and metric.rejects(plan, scale, value)
+        if not rejected or metric.log_rejected:
+            logger.write_to_agent_trust_log(agent, metric.name, other_agent, value, resource_id)
+        if rejected:
+            return True, trust_values
+        if metric.is_final_input is None or metric.is_final_input(plan):
+            trust_values[metric.name] = value
+    with metric_executor_lock:
+        if metric_executor is None:
+            metric_executor = ThreadPoolExecutor(max_workers=METRIC_WORKERS, thread_name_prefix="metric")
+    futures = {metric.name: metric_executor.submit(metric.calculate, inputs)
+               for metric in metrics[gate_end:] if metric.does_io}
+    try:
+        values = {metric.name: metric.calculate(inputs) for metric in metrics[gate_end:] if not metric.does_io}
+        values.update({name: future.result() for name, future in futures.items()})
+    except BaseException:
+        inputs['cancel_event'].set()
+        for future in futures.values():
+            future.cancel()
+        raise
+    for metric in metrics[gate_end:]:
+        logger.write_to_agent_trust_log(agent, metric.name, other_agent, values[metric.name], resource_id)
+        if metric.is_final_input is None or metric.is_final_input(plan):
+            trust_values[metric.name] = values[metric.name]
+    return False, trust_values
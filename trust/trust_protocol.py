@@ -0,0 +1,160 @@
+import json
+from concurrent.futures import Future
+from datetime import datetime
+from threading import Lock
+from loggers.basic_logger import BasicLogger
+from models import Scale
+from exec.response_cache import ResponseCache
+from exec.ask_others import ask_other_agents
+
+
+def batch_message(requests):
+    """
+    Creates the message of the trust protocol's batch operation, which asks for several operations on resources at
+    once in one request, e.g. for recommendation and popularity or for several related resources.
+
+    :param requests: The (operation, resource_id, recency_limit) tuples to ask for, where operation is either
+    'recommendation' or 'popularity'.
+    :type requests: list
+    :return: The message to send via the trust protocol.
+    :rtype: str
+    """
+    return "batch_" + json.dumps([[operation, resource_id, recency_limit.strftime(BasicLogger.get_time_format_string())]
+                                  for operation, resource_id, recency_limit in requests])
+
+
+def parse_batch_response(response):
+    """
+    :param response: Response of another agent to a batch message, or None if it did not answer.
+    :type response: str
+    :return: The values in order of the requests of the batch message as the single operations respond them, or
+    None if the agent did not answer.
+    :rtype: list or None
+    """
+    return json.loads(response) if response is not None else None
+
+
+def parse_value(response):
+    """
+    :param response: The value of a recommendation or popularity operation as responded by another agent, or None if
+    it did not answer.
+    :type response: str
+    :return: The recommendation value or whether the resource is popular, or None if not known or answered.
+    :rtype: float or bool or None
+    """
+    if response is None or response == 'None':
+        return None
+    if response in ('True', 'False'):
+        return response == 'True'
+    return float(response)
+
+
+class PeerRequests:
+    """
+    Asks each peer at most once within the evaluation of one resource with one batch message for all operations the
+    agent's metrics ask peers for, such that e.g. the recommendation, user expertise and popularity metrics share one
+    request per peer. Metrics asking peers already asked by another metric wait for that request's response.
+    """
+    def responses(self, operation, peers):
+        """
+        :param operation: The operation of the batch message to return the values of.
+        :type operation: str
+        :param peers: The agents to ask.
+        :type peers: list
+        :return: The value of each peer by `parse_value`, or None if it did not answer, by peer.
+        :rtype: dict
+        """
+        with self.lock:
+            to_ask = [peer for peer in peers if peer not in self.requests]
+            for peer in to_ask:
+                self.requests[peer] = Future()
+        try:
+            if to_ask:
+                for peer, response in ask_other_agents(to_ask, self.discovery, self.message,
+                                                       cancel_event=self.cancel_event).items():
+                    self.requests[peer].set_result(parse_batch_response(response))
+        finally:
+            # peers of a failed request are handled as not answering for all metrics waiting for them
+            for peer in to_ask:
+                if not self.requests[peer].done():
+                    self.requests[peer].set_result(None)
+        index = self.operations.index(operation)
+        values = {}
+        for peer in peers:
+            batch_values = self.requests[peer].result()
+            values[peer] = parse_value(batch_values[index]) if batch_values is not None else None
+        return values
+
+    def __init__(self, discovery, resource_id, recency_limit, operations, cancel_event=None):
+        """
+        :param discovery: Addresses of all agents within the scenario.
+        :type discovery: dict
+        :param resource_id: The URI of the evaluated resource.
+        :type resource_id: str
+        :param recency_limit: A datetime object which is used for "forgetting" old history entries
+        :type recency_limit: datetime
+        :param operations: The operations to ask each peer for, either 'recommendation' or 'popularity'.
+        :type operations: tuple
+        :param cancel_event: Event set when the evaluation is cancelled and peers need not be waited for anymore.
+        :type cancel_event: threading.Event
+        """
+        self.discovery = discovery
+        self.operations = operations
+        self.message = batch_message([(operation, resource_id, recency_limit) for operation in operations])
+        self.cancel_event = cancel_event
+        # the batch values of each peer asked as future
+        self.requests = {}
+        self.lock = Lock()
+
+
+def batch_response(agent, message, scale, logger, response_cache=None):
+    """
+    Answers all requests of a batch message with the values of the single operations, while reading the history of
+    agent once for all requested resources not answered by the cache.
+
+    :param agent: The agent which answers the requests.
+    :type agent: str
+    :param message: The received trust protocol message of the batch operation.
+    :type message: str
+    :param scale: The Scale object to be used by the agent.
+    :type scale: Scale
+    :param logger: The logger object to be used by the agent.
+    :type logger: BasicLogger
+    :param response_cache: The cache of agent's answers, or None to calculate all values.
+    :type response_cache: ResponseCache
+    :return: The values in order of the requests as JSON list of the values as the single operations respond them,
+    with 'None' for unknown operations.
+    :rtype: str
+    """
+    requests = [(operation, resource_id, datetime.strptime(recency_str, BasicLogger.get_time_format_string()))
+                for operation, resource_id, recency_str in json.loads(message[len("batch_"):])]
+    values = [None] * len(requests)
+    versions = {}
+    uncached = []
+    for index, (operation, resource_id, recency_limit) in enumerate(requests):
+        if response_cache is not None:
+            versions[resource_id] = versions.get(resource_id, response_cache.version(resource_id))
+            cached, values[index] = response_cache.lookup(operation, resource_id, recency_limit, versions[resource_id])
+            if cached:
+                continue
+        uncached.append(index)
+    if not uncached:
+        return json.dumps([str(value) for value in values])
+    # all lines are read for the oldest recency limit requested and cut to each request's limit afterwards
+    history = logger.read_lines_from_agent_history_by_resources(
+        agent, [requests[index][1] for index in uncached], min(requests[index][2] for index in uncached))
+    for index in uncached:
+        operation, resource_id, recency_limit = requests[index]
+        history_lines = BasicLogger.filter_recency(history[resource_id], recency_limit)
+        if operation == "recommendation":
+            # same as recommendation_response, thus the direct experience of agent
+            values[index] = BasicLogger.mean_trust_value(history_lines)
+        elif operation == "popularity":
+            # same as popularity_response
+            values[index] = any(entry['trust_value'] is not None and
+                                entry['trust_value'] >= scale.minimum_to_trust_others() for entry in history_lines)
+        else:
+            continue
+        if response_cache is not None:
+            response_cache.store(operation, resource_id, recency_limit, versions[resource_id], values[index])
+    return json.dumps([str(value) for value in values])